@@ -0,0 +1,77 @@
+#
+# Hardware-free benchmark of a full logger snapshot over the FTDI interface.
+# Runs the MPSSE code against the emulator and reports the USB round trips,
+# bytes transferred and modeled time per snapshot for each mode of operation.
+# The data read back is checked against the emulated register values.
+#
+# Usage: python benchmarks/bench_ftdi_snapshot.py [-n SNAPSHOTS]
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+import argparse
+import os
+import sys
+import time
+
+#Allow running from the repository root without installing anything
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import max1730x_logger
+from ftdi_emulator import mpsse_emulator
+from mpsse_iface import mpsse_i2c
+
+#Modes to compare: (description, batched, clock rate)
+MODES = [('Per-byte, 100kHz',  False, 100000),
+         ('Batched, 100kHz',   True,  100000),
+         ('Batched, 400kHz',   True,  400000)]
+
+
+def expected_results(emu, requests):
+    '''
+    Builds the data each request should return from the emulated registers
+    '''
+    target = emu.target
+    results = []
+    for r in requests:
+        base = target.dev_bases[r.bus_addr & 0xFE] + r.reg_addr
+        if base in target.blocks:
+            results.append(bytes(target.blocks[base][:r.num_bytes]))
+        else:
+            words = [target.regs.get(base + i, 0) for i in range((r.num_bytes + 1) // 2)]
+            results.append(b''.join(w.to_bytes(2, 'little') for w in words)[:r.num_bytes])
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark a logger snapshot over the emulated FTDI interface',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-n', dest='snapshots', type=int, default=5,
+                        help='Number of snapshots to run per mode')
+    args = parser.parse_args()
+
+    requests = max1730x_logger.get_read_requests(bus_dev = mpsse_i2c)
+    print('{:<18} {:>8} {:>10} {:>9} {:>10} {:>10} {:>10}'.format(
+          'Mode', 'USB R/Ts', 'Bytes out', 'Bytes in', 'Wire (ms)', 'Model (ms)', 'CPU (ms)'))
+    for name, batched, clock_hz in MODES:
+        emu = mpsse_emulator()
+        bus = mpsse_i2c(emu, batched, clock_hz)
+        expected = expected_results(emu, requests)
+        emu.reset_stats()
+        start = time.perf_counter()
+        for _ in range(args.snapshots):
+            if [bytes(r) for r in bus.i2c_read_batch(requests)] != expected:
+                print('{}: data read back does not match the emulated registers!'.format(name))
+                sys.exit(1)
+        cpu = (time.perf_counter() - start) / args.snapshots
+        n = args.snapshots
+        print('{:<18} {:>8.0f} {:>10.0f} {:>9.0f} {:>10.2f} {:>10.2f} {:>10.2f}'.format(
+              name, emu.round_trips / n, emu.bytes_out / n, emu.bytes_in / n,
+              emu.wire_time * 1000 / n, emu.modeled_time * 1000 / n, cpu * 1000))
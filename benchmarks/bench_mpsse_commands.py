@@ -0,0 +1,66 @@
+#
+# Microbenchmark for building the FTDI MPSSE command streams of a full logger
+# snapshot. Compares building every transaction from scratch (as lists, the
+# way the commands were originally generated) against the cached templates in
+# mpsse_i2c_commands. No hardware is required.
+#
+# Usage: python benchmarks/bench_mpsse_commands.py [-n ITERATIONS]
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+import argparse
+import os
+import sys
+import timeit
+
+#Allow running from the repository root without installing anything
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import max1730x_logger
+from mpsse_iface import mpsse_i2c, mpsse_i2c_commands, CMD_SEND_IMMEDIATE
+
+
+def build_uncached(requests):
+    '''
+    Builds the snapshot's command stream from scratch on every call
+    '''
+    cmd_data = []
+    for r in requests:
+        cmd_data.extend(mpsse_i2c_commands.build_read_transaction(r.bus_addr, r.reg_addr, r.num_bytes))
+    cmd_data.append(CMD_SEND_IMMEDIATE)
+    return bytes(cmd_data)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark MPSSE command generation for a logger snapshot',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-n', dest='iterations', type=int, default=200,
+                        help='Number of snapshots to build per measurement')
+    args = parser.parse_args()
+
+    requests = max1730x_logger.get_read_requests(bus_dev = mpsse_i2c)
+    cmds = mpsse_i2c_commands()
+
+    #Both approaches need to produce the same bytes on the wire
+    cached = b''.join(g[0] for g in cmds.read_batch(requests))
+    if cached != build_uncached(requests):
+        print('Cached command stream does not match the uncached build!')
+        sys.exit(1)
+
+    before = min(timeit.repeat(lambda: build_uncached(requests),
+                               number=args.iterations, repeat=5)) / args.iterations
+    after = min(timeit.repeat(lambda: cmds.read_batch(requests),
+                              number=args.iterations, repeat=5)) / args.iterations
+
+    print('Snapshot: {:d} transactions, {:d} command bytes'.format(len(requests), len(cached)))
+    print('Uncached build: {:10.1f} us/snapshot'.format(before * 1e6))
+    print('Cached lookup:  {:10.1f} us/snapshot'.format(after * 1e6))
+    print('Speedup:        {:10.1f}x'.format(before / after))
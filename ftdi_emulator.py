@@ -0,0 +1,486 @@
+#
+# Software emulation of a FTDI MPSSE device with a MAX1730x attached to the
+# I2C bus. Used for hardware-free benchmarks of the FTDI interface code.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+import max1730x_regs
+from math import ceil
+from time import sleep
+from mpsse_iface import mpsse_i2c, FT_DEFAULT_I2C_CLOCK, FT_READ_TIMEOUT
+
+#MPSSE opcodes understood by the emulator. See FTDI AN_108
+OP_SET_BITS_LOW     = 0x80
+OP_GET_BITS_LOW     = 0x81
+OP_SET_BITS_HIGH    = 0x82
+OP_GET_BITS_HIGH    = 0x83
+OP_LOOPBACK_ON      = 0x84
+OP_LOOPBACK_OFF     = 0x85
+OP_SET_CLOCK        = 0x86
+OP_SEND_IMMEDIATE   = 0x87
+OP_CLKDIV5_OFF      = 0x8A
+OP_CLKDIV5_ON       = 0x8B
+OP_3PHASE_ON        = 0x8C
+OP_3PHASE_OFF       = 0x8D
+OP_CLK_BITS         = 0x8E
+OP_CLK_BYTES        = 0x8F
+OP_ADAPTIVE_ON      = 0x96
+OP_ADAPTIVE_OFF     = 0x97
+OP_BITS_OUT_NEG     = 0x13
+OP_BITS_IN_POS      = 0x22
+OP_BYTES_OUT_NEG    = 0x11
+OP_BYTES_IN_POS     = 0x20
+BAD_COMMAND         = 0xFA
+
+#Timing model constants. A USB 2.0 high speed micro-frame is 125us, and the
+#FTDI only moves data to/from the host on frame boundaries.
+USB_FRAME_S         = 125e-6
+USB_PACKET_SIZE     = 512
+USB_STATUS_BYTES    = 2
+
+#Default block data for the SBS block registers. The first byte is the SMBus
+#length prefix, followed by the payload
+DEFAULT_SBS_BLOCKS = {
+    0x11C : b'\x05\x01\x23\x45\x67\x89',
+    0x120 : b'\x04MAXI',
+    0x121 : b'\x04M173',
+    0x122 : b'\x03LIO',
+    0x123 : b'\x08\x00\x01\x02\x03\x04\x05\x06\x07',
+}
+
+#SBS registers not implemented by the part. Reads of these are NACK'd
+DEFAULT_NACK_REGS = (0x170,)
+
+
+def default_register_values():
+    '''
+    Builds a set of register values for every named register in max1730x_regs.
+    The values are arbitrary but deterministic, so that reads through the
+    emulator can be checked against the expected data.
+
+    :return: Dictionary of full register address to 16-bit value
+    '''
+    values = {}
+    for page in max1730x_regs.REGISTER_PAGES:
+        for idx, name in enumerate(page.reg_names):
+            addr = page.base_addr + idx
+            values[addr] = ((addr * 0x9E37) ^ 0x5A5A) & 0xFFFF
+    for sbs in max1730x_regs.SBS_REGISTERS:
+        if sbs.block_size <= 0:
+            values[sbs.base_addr] = ((sbs.base_addr * 0x9E37) ^ 0x5A5A) & 0xFFFF
+    return values
+
+
+class i2c_target_sim:
+    '''
+    Bit level model of a MAX1730x on the I2C bus. The device answers on both
+    the M5 (0x6C) and SBS/NV (0x16) addresses, with the register pointer auto
+    incrementing by one word for every two bytes read.
+    '''
+    def __init__(self, regs: dict = None, blocks: dict = None,
+                 nack_regs = DEFAULT_NACK_REGS):
+        '''
+        :param regs: Dictionary of full register address to 16-bit value.
+                     Defaults to default_register_values()
+        :param blocks: Dictionary of full register address to block data for
+                       the SBS block registers. Defaults to DEFAULT_SBS_BLOCKS
+        :param nack_regs: Full register addresses to NACK when addressed
+        '''
+        self.regs = default_register_values() if regs is None else regs
+        self.blocks = dict(DEFAULT_SBS_BLOCKS) if blocks is None else blocks
+        self.nack_regs = set(nack_regs)
+        self.dev_bases = {max1730x_regs.M5_DEV_ADDR : 0x000,
+                          max1730x_regs.SBS_NV_DEV_ADDR : 0x100}
+        self.stuck_clocks = 0
+        self.starts = 0
+        self.stops = 0
+        self.__state = 'idle'
+        self.__shift = 0
+        self.__nbits = 0
+        self.__ack = 1
+        self.__next = 'idle'
+        self.__base = 0
+        self.__ptr = 0
+        self.__offset = 0
+        self.__out = 0xFF
+
+    def hold_sda_low(self, clocks: int):
+        '''
+        Simulates a target stuck mid-byte, holding SDA low for the next number
+        of SCL clocks regardless of START/STOP conditions.
+        :param clocks: Number of clocks to hold SDA low for
+        '''
+        self.stuck_clocks = clocks
+
+    def start(self):
+        '''
+        START (or repeated START) condition seen on the bus
+        '''
+        if self.stuck_clocks:
+            return
+        self.starts += 1
+        self.__state = 'addr'
+        self.__shift = 0
+        self.__nbits = 0
+
+    def stop(self):
+        '''
+        STOP condition seen on the bus
+        '''
+        if self.stuck_clocks:
+            return
+        self.stops += 1
+        self.__state = 'idle'
+
+    def __load_byte(self):
+        '''
+        Loads the next byte to be shifted out from the register pointer
+        '''
+        addr = self.__base + self.__ptr
+        if addr in self.blocks:
+            data = self.blocks[addr]
+            self.__out = data[self.__offset] if self.__offset < len(data) else 0xFF
+            self.__offset += 1
+            return
+        word = self.regs.get(addr, 0)
+        self.__out = (word >> (8 * self.__offset)) & 0xFF
+        self.__offset += 1
+        if self.__offset == 2:
+            self.__offset = 0
+            self.__ptr = (self.__ptr + 1) & 0xFF
+
+    def __byte_received(self, data):
+        '''
+        Handles a complete byte shifted in from the master, setting up the
+        ACK/NACK response and the state following it.
+        :param data: Byte received
+        '''
+        if self.__state == 'addr':
+            if (data & 0xFE) not in self.dev_bases:
+                self.__ack, self.__next = 1, 'nacked'
+            elif data & 0x1:
+                self.__ack, self.__next = 0, 'rdata'
+            else:
+                self.__base = self.dev_bases[data & 0xFE]
+                self.__ack, self.__next = 0, 'reg'
+        elif self.__state == 'reg':
+            if (self.__base + data) in self.nack_regs:
+                self.__ack, self.__next = 1, 'nacked'
+            else:
+                self.__ptr = data
+                self.__offset = 0
+                self.__ack, self.__next = 0, 'wdata'
+        else:
+            #Register writes are accepted but ignored
+            self.__ack, self.__next = 0, 'wdata'
+        self.__state = 'ack'
+
+    def clock(self, master_sda: int):
+        '''
+        Clocks a single bit on the bus.
+        :param master_sda: Level driven by the master (1 = released)
+        :return: Resulting level of SDA on the bus
+        '''
+        if self.stuck_clocks:
+            self.stuck_clocks -= 1
+            return 0
+
+        state = self.__state
+        if state in ('addr', 'reg', 'wdata'):
+            self.__shift = ((self.__shift << 1) | master_sda) & 0xFF
+            self.__nbits += 1
+            if self.__nbits == 8:
+                self.__nbits = 0
+                self.__byte_received(self.__shift)
+            return master_sda
+        if state == 'ack':
+            self.__state = self.__next
+            if self.__state == 'rdata':
+                self.__load_byte()
+            return master_sda & self.__ack
+        if state == 'rdata':
+            bit = (self.__out >> (7 - self.__nbits)) & 0x1
+            self.__nbits += 1
+            if self.__nbits == 8:
+                self.__nbits = 0
+                self.__state = 'mack'
+            return master_sda & bit
+        if state == 'mack':
+            if master_sda:
+                self.__state = 'idle'
+            else:
+                self.__load_byte()
+                self.__state = 'rdata'
+            return master_sda
+        return master_sda
+
+
+class mpsse_emulator:
+    '''
+    In-process stand in for a ftd2xx device handle in MPSSE mode. Commands
+    written are parsed and executed against an i2c_target_sim, and responses
+    are queued for read(). A simple timing model accumulates the time the
+    transfers would have taken on real hardware: on-wire time from the
+    programmed clock rate, plus USB frame, transfer size and latency timer
+    delays for every read that has to wait on the device.
+    '''
+    def __init__(self, target: i2c_target_sim = None, realtime: bool = False,
+                 max_read_chunk: int = None):
+        '''
+        :param target: I2C target on the bus. Defaults to a i2c_target_sim with
+                       the default register values
+        :param realtime: Sleep for the modeled time of each transfer
+        :param max_read_chunk: Limit the number of bytes returned by each read
+                               call, to simulate short USB reads
+        '''
+        self.target = i2c_target_sim() if target is None else target
+        self.realtime = realtime
+        self.max_read_chunk = max_read_chunk
+        self.latency_ms = 16
+        self.usb_in_size = 4096
+        self.usb_out_size = 4096
+        self.bit_mode = 0
+        self.clock_hz = 0
+        self.__rx = bytearray()
+        self.__pending = bytearray()
+        self.__flushed = 0
+        self.__div5 = True
+        self.__3phase = False
+        self.__divisor = 0
+        self.__scl = 1
+        self.__sda = 1
+        self.reset_stats()
+
+    def reset_stats(self):
+        '''
+        Clears the transfer counters and modeled time
+        '''
+        self.writes = 0
+        self.reads = 0
+        self.round_trips = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.bus_bits = 0
+        self.wire_time = 0.0
+        self.usb_time = 0.0
+
+    @property
+    def modeled_time(self):
+        '''
+        Total modeled time of the transfers since the last reset_stats()
+        '''
+        return self.wire_time + self.usb_time
+
+    def __update_clock(self):
+        base = 12000000 if self.__div5 else 60000000
+        hz = base / ((1 + self.__divisor) * 2)
+        if self.__3phase:
+            hz = hz * 2 / 3
+        self.clock_hz = hz
+
+    def __set_pins(self, value, direction):
+        '''
+        Updates the master's view of SCL/SDA and detects START/STOP conditions.
+        Pins configured as inputs are assumed to be pulled high.
+        '''
+        scl = (value & 0x1) if direction & 0x1 else 1
+        sda = ((value >> 1) & 0x1) if direction & 0x2 else 1
+        if scl and self.__scl:
+            if self.__sda and not sda:
+                self.target.start()
+            elif sda and not self.__sda:
+                self.target.stop()
+        self.__scl = scl
+        self.__sda = sda
+
+    def __clock_bits(self, nbits, data = 0xFF):
+        '''
+        Clocks nbits on the bus, MSB first, returning the sampled SDA bits
+        '''
+        result = 0
+        for i in range(nbits):
+            master = (data >> (7 - i)) & 0x1
+            result = (result << 1) | self.target.clock(master)
+        self.bus_bits += nbits
+        self.__scl = 0
+        return result
+
+    def __execute(self):
+        '''
+        Executes all complete commands in the pending buffer
+        '''
+        buf = self.__pending
+        idx = 0
+        while idx < len(buf):
+            op = buf[idx]
+            if op in (OP_SET_BITS_LOW, OP_SET_BITS_HIGH):
+                if idx + 3 > len(buf):
+                    break
+                if op == OP_SET_BITS_LOW:
+                    self.__set_pins(buf[idx + 1], buf[idx + 2])
+                idx += 3
+            elif op in (OP_GET_BITS_LOW, OP_GET_BITS_HIGH):
+                if op == OP_GET_BITS_LOW:
+                    sda = self.__sda & (0 if self.target.stuck_clocks else 1)
+                    self.__rx.append(self.__scl | (sda << 1) | (sda << 2))
+                else:
+                    self.__rx.append(0xFF)
+                idx += 1
+            elif op == OP_SET_CLOCK:
+                if idx + 3 > len(buf):
+                    break
+                self.__divisor = buf[idx + 1] | (buf[idx + 2] << 8)
+                self.__update_clock()
+                idx += 3
+            elif op == OP_BITS_OUT_NEG:
+                if idx + 3 > len(buf):
+                    break
+                self.__clock_bits(buf[idx + 1] + 1, buf[idx + 2])
+                self.__sda = (buf[idx + 2] >> (7 - buf[idx + 1])) & 0x1
+                idx += 3
+            elif op == OP_BITS_IN_POS:
+                if idx + 2 > len(buf):
+                    break
+                self.__rx.append(self.__clock_bits(buf[idx + 1] + 1))
+                self.__sda = 1
+                idx += 2
+            elif op in (OP_BYTES_OUT_NEG, OP_BYTES_IN_POS, OP_CLK_BYTES):
+                if idx + 3 > len(buf):
+                    break
+                count = (buf[idx + 1] | (buf[idx + 2] << 8)) + 1
+                if op == OP_BYTES_OUT_NEG:
+                    if idx + 3 + count > len(buf):
+                        break
+                    for b in buf[idx + 3:idx + 3 + count]:
+                        self.__clock_bits(8, b)
+                    idx += 3 + count
+                    continue
+                for _ in range(count):
+                    byte = self.__clock_bits(8)
+                    if op == OP_BYTES_IN_POS:
+                        self.__rx.append(byte)
+                idx += 3
+            elif op == OP_CLK_BITS:
+                if idx + 2 > len(buf):
+                    break
+                self.__clock_bits(buf[idx + 1] + 1)
+                idx += 2
+            elif op == OP_SEND_IMMEDIATE:
+                self.__flushed = len(self.__rx)
+                idx += 1
+            elif op in (OP_CLKDIV5_OFF, OP_CLKDIV5_ON):
+                self.__div5 = (op == OP_CLKDIV5_ON)
+                self.__update_clock()
+                idx += 1
+            elif op in (OP_3PHASE_ON, OP_3PHASE_OFF):
+                self.__3phase = (op == OP_3PHASE_ON)
+                self.__update_clock()
+                idx += 1
+            elif op in (OP_ADAPTIVE_ON, OP_ADAPTIVE_OFF, OP_LOOPBACK_ON,
+                        OP_LOOPBACK_OFF):
+                idx += 1
+            else:
+                #Unknown opcodes are echoed back as a bad command
+                self.__rx.extend([BAD_COMMAND, op])
+                self.__flushed = len(self.__rx)
+                idx += 1
+        del buf[:idx]
+
+    def __account(self, seconds):
+        self.usb_time += seconds
+        if self.realtime:
+            sleep(seconds)
+
+    ##
+    # ftd2xx compatible interface
+    ##
+    def write(self, data):
+        self.writes += 1
+        self.bytes_out += len(data)
+        bits = self.bus_bits
+        self.__pending.extend(data)
+        self.__execute()
+        if self.clock_hz:
+            wire = (self.bus_bits - bits) / self.clock_hz
+            self.wire_time += wire
+            if self.realtime:
+                sleep(wire)
+        #Each OUT transfer is at least one frame
+        self.__account(USB_FRAME_S * ceil(len(data) / self.usb_out_size))
+        return len(data)
+
+    def read(self, nbytes):
+        self.reads += 1
+        if nbytes <= 0:
+            return b''
+        count = min(nbytes, len(self.__rx))
+        if self.max_read_chunk is not None:
+            count = min(count, self.max_read_chunk)
+        data = bytes(self.__rx[:count])
+        del self.__rx[:count]
+        self.bytes_in += count
+        self.round_trips += 1
+
+        #Data only comes back early if it fills a packet or was flushed with
+        #SEND_IMMEDIATE. Otherwise the last partial packet waits on the latency
+        #timer. Each IN transfer is at least one frame
+        unflushed = count - min(count, self.__flushed)
+        self.__flushed = max(0, self.__flushed - count)
+        delay = USB_FRAME_S * ceil(max(count, 1) / self.usb_in_size)
+        if unflushed % (USB_PACKET_SIZE - USB_STATUS_BYTES):
+            delay += self.latency_ms / 1000.0
+        self.__account(delay)
+        return data
+
+    def getQueueStatus(self):
+        return len(self.__rx)
+
+    def setLatencyTimer(self, latency):
+        self.latency_ms = latency
+
+    def getLatencyTimer(self):
+        return self.latency_ms
+
+    def setUSBParameters(self, in_tx_size, out_tx_size = 0):
+        self.usb_in_size = in_tx_size
+        if out_tx_size:
+            self.usb_out_size = out_tx_size
+
+    def setTimeouts(self, read_timeout, write_timeout):
+        pass
+
+    def setBitMode(self, mask, enable):
+        self.bit_mode = enable
+        self.__pending.clear()
+
+    def purge(self, mask = 0):
+        self.__rx.clear()
+        self.__pending.clear()
+        self.__flushed = 0
+
+    def resetDevice(self):
+        self.purge()
+
+    def close(self):
+        pass
+
+
+class emulator_i2c(mpsse_i2c):
+    '''
+    I_I2C interface running the MPSSE code against a mpsse_emulator, so the
+    logger can be run without any hardware attached. Transfers take their
+    modeled time in real time, so the logging loop sees realistic delays.
+    '''
+    def __init__(self, bus_num: int, batched: bool = True,
+                 clock_hz: int = FT_DEFAULT_I2C_CLOCK,
+                 read_timeout: float = FT_READ_TIMEOUT):
+        self.emulator = mpsse_emulator(realtime=True)
+        super().__init__(self.emulator, batched, clock_hz, read_timeout)
+
@@ -11,17 +11,104 @@
 #
 # Author: Brent Kowal <brent.kowal@analog.com>
 #
+from collections import namedtuple
+
+#Describes a single read for I_I2C.i2c_read_batch. bus_addr is the 8-bit I2C
+#bus address, reg_addr is the starting register address (8-bit, as sent on the
+#bus) and num_bytes is the number of bytes to read from it
+I2C_ReadRequest = namedtuple('I2C_ReadRequest', ['bus_addr', 'reg_addr', 'num_bytes'])
+
+#Range of I2C clock rates which can be asked for, in Hz. The MAX1730x runs at
+#up to 400kHz (fast mode), and SMBus devices may time out below 10kHz
+I2C_MIN_CLOCK = 10000
+I2C_MAX_CLOCK = 400000
+
+#Bytes written as part of a register read, in the order they are sent. Used as
+#the byte_index of a I2CNackError
+NACK_BYTE_NAMES = ['device address (write)', 'register address', 'device address (read)']
+
+def split_read_requests(requests: list, max_bytes: int):
+    '''
+    Splits any reads longer than max_bytes into several shorter ones. Registers
+    are 16-bit, so each piece starts at the register following the last word
+    of the piece before it.
+
+    :param requests: List of I2C_ReadRequest
+    :param max_bytes: Largest number of bytes to read in one transaction
+    :return: Tuple of the list of reads to make, and the number of those reads
+             making up each of the original requests. The counts are None if
+             nothing needed to be split
+    '''
+    if all(r.num_bytes <= max_bytes for r in requests):
+        return requests, None
+    max_bytes &= ~0x1
+    reads = []
+    counts = []
+    for r in requests:
+        offsets = range(0, r.num_bytes, max_bytes)
+        reads.extend(I2C_ReadRequest(r.bus_addr, r.reg_addr + (ofs >> 1),
+                                     min(max_bytes, r.num_bytes - ofs))
+                     for ofs in offsets)
+        counts.append(len(offsets))
+    return reads, counts
+
+def join_read_results(results: list, counts: list):
+    '''
+    Puts the results of reads split by split_read_requests() back together
+
+    :param results: Results of the reads returned by split_read_requests()
+    :param counts: Counts returned by split_read_requests()
+    :return: List of bytes, one entry per original request
+    '''
+    if counts is None:
+        return results
+    joined = []
+    idx = 0
+    for ct in counts:
+        joined.append(b''.join(results[idx:idx + ct]) if ct != 1 else results[idx])
+        idx += ct
+    return joined
+
+class I2CNackError(IOError):
+    '''
+    Raised when a device fails to acknowledge a byte of a register read.
+    Records which device, register and byte of the transaction was NACK'd.
+    '''
+    def __init__(self, bus_addr: int, reg_addr: int, byte_index: int):
+        '''
+        :param bus_addr: 8-bit I2C bus address of the transaction
+        :param reg_addr: Register address of the transaction
+        :param byte_index: Index of the NACK'd byte. See NACK_BYTE_NAMES.
+                           None where the interface can't tell which
+        '''
+        self.bus_addr = bus_addr
+        self.reg_addr = reg_addr
+        self.byte_index = byte_index
+        where = '' if byte_index is None else ' on ' + NACK_BYTE_NAMES[byte_index]
+        super().__init__('NACK{} reading device 0x{:02X}, register 0x{:02X}'.format(
+                         where, bus_addr & 0xFE, reg_addr))
 
 class I_I2C:
     '''
     Interface class defining basic read access to the I2C as needed by the
     MAX1730x devices
     '''
+    #Largest number of bytes the interface can read in a single transaction.
+    #Longer word reads are split into several transactions
+    MAX_READ_BYTES = 32
+
+    #Cost of an extra transaction, as the number of bytes which could be read
+    #in the same time. On the bus, the address and register bytes plus the
+    #start, repeated start and stop come to roughly 4 bytes. Used to decide
+    #when reading over unneeded registers beats starting a new read
+    TXN_OVERHEAD_BYTES = 4
+
     def i2c_read_words(self, bus_addr: int, reg_addr: int, num_words: int):
         '''
         Reads a series of words (unsigned 16-bit) from the device starting
         at the provided reg_addr.  2x num_words is read, and the result is
-        a list of uint16, built via little endian from the read bytes.
+        a list of uint16, built via little endian from the read bytes. Reads
+        longer than MAX_READ_BYTES are split up as needed.
 
         :param bus_addr: 8-bit I2C bus address. lsb (R/W bit) is ignored
         :param reg_addr: Starting register address to read from
@@ -50,3 +137,89 @@ class I_I2C:
         :return: Read word
         '''
         raise NotImplementedError
+
+    def i2c_read_batch(self, requests: list):
+        '''
+        Performs a series of reads, returning all of the results together.
+        Interfaces which can pipeline several transactions into fewer bus or
+        USB accesses should override this. The default simply performs each
+        read in order. Reads longer than MAX_READ_BYTES are treated as word
+        reads, and split up as needed.
+
+        :param requests: List of I2C_ReadRequest describing the reads
+        :return: List of bytes, one entry per request in the same order.
+                 Interfaces may return read-only views (memoryview) of a
+                 buffer reused by their next batch instead, so copy the data
+                 with bytes() if it needs to be kept
+        '''
+        reads, counts = split_read_requests(requests, self.MAX_READ_BYTES)
+        return join_read_results([bytes(self.sbs_block_read(r.bus_addr, r.reg_addr, r.num_bytes))
+                                  for r in reads], counts)
+
+    def set_clock(self, clock_hz: int):
+        '''
+        Sets the I2C bus clock rate. The interface picks the closest rate it
+        can produce that does not exceed the request.
+
+        :param clock_hz: Requested clock rate in Hz, from I2C_MIN_CLOCK to
+                         I2C_MAX_CLOCK
+        :return: Actual clock rate in Hz
+        :raises: NotImplementedError if the interface can't change the rate
+        :raises: ValueError if the rate is out of range
+        '''
+        raise NotImplementedError
+
+    def get_clock(self):
+        '''
+        Gets the current I2C bus clock rate
+
+        :return: Clock rate in Hz
+        :raises: NotImplementedError if the interface doesn't know the rate
+        '''
+        raise NotImplementedError
+
+    def set_usb_params(self, latency_ms: int = None, in_size: int = None,
+                       out_size: int = None):
+        '''
+        Sets the USB latency timer and transfer sizes of a USB attached
+        interface. Any value left as None is unchanged.
+
+        :param latency_ms: Latency timer in ms
+        :param in_size: USB IN (device to host) transfer size in bytes
+        :param out_size: USB OUT (host to device) transfer size in bytes
+        :return: Tuple of the (latency_ms, in_size, out_size) now in use
+        :raises: NotImplementedError if the interface isn't USB attached
+        '''
+        raise NotImplementedError
+
+    def auto_usb_params(self, requests: list):
+        '''
+        Picks and sets the USB latency timer and transfer sizes best suited to
+        performing the given reads with i2c_read_batch.
+
+        :param requests: List of I2C_ReadRequest the interface will be used for
+        :return: Tuple of the (latency_ms, in_size, out_size) now in use
+        :raises: NotImplementedError if the interface isn't USB attached
+        '''
+        raise NotImplementedError
+
+    def recover_bus(self):
+        '''
+        Attempts to return the bus to a usable state after a failure, such as
+        a target left holding SDA low part way through a transaction.
+
+        :return: True if the bus was confirmed free afterwards, False if it is
+                 still held, or None if the interface can't tell
+        :raises: NotImplementedError if the interface has no recovery method
+        '''
+        raise NotImplementedError
+
+    def get_stats(self):
+        '''
+        Gets any counters the interface keeps about its own operation, such as
+        retries or short reads, for reporting alongside the logging status.
+
+        :return: Dictionary of counter name to value. Empty if none are kept
+        '''
+        return {}
+
@@ -0,0 +1,249 @@
+#
+# Interfaces class to for using native I2C on Linux to talk to devices.
+# Drives the /dev/i2c-N character device directly with I2C_RDWR ioctls, so no
+# packages outside of the standard library are needed
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+from i2c_iface import I_I2C, I2C_ReadRequest, I2CNackError, split_read_requests
+from struct import Struct
+import ctypes
+import errno
+import os
+
+#ioctl request number and message flag, from linux/i2c-dev.h and linux/i2c.h
+I2C_RDWR = 0x0707
+I2C_M_RD = 0x0001
+
+#Kernel limits on the number of messages in a single I2C_RDWR ioctl, and the
+#length of each message. Each read takes two messages: the register address
+#write and the data read
+I2C_RDWR_MAX_MSGS = 42
+I2C_RDWR_MAX_BYTES = 8192
+
+#Cost of an extra read in an I2C_RDWR call, in bytes read. On top of the bus
+#overhead, the adapter driver sets up each message separately, which usually
+#means another interrupt or two
+I2C_RDWR_MSG_OVERHEAD_BYTES = 8
+
+#Errors adapter drivers give for a NACK. Which one depends on the driver, and
+#whether it was the address or a data byte. EIO is left out, as it's also what
+#a noisy bus gives (lost arbitration, timeouts), and taking that for a NACK
+#could drop a working SBS register for good
+I2C_NACK_ERRNOS = (errno.ENXIO, errno.EREMOTEIO)
+
+#Number of read plans kept before the cache is cleared and rebuilt
+I2CDEV_PLAN_CACHE_SIZE = 256
+
+
+class i2c_msg(ctypes.Structure):
+    '''
+    struct i2c_msg from linux/i2c.h
+    '''
+    _fields_ = [('addr', ctypes.c_uint16),
+                ('flags', ctypes.c_uint16),
+                ('len', ctypes.c_uint16),
+                ('buf', ctypes.POINTER(ctypes.c_uint8))]
+
+
+class i2c_rdwr_ioctl_data(ctypes.Structure):
+    '''
+    struct i2c_rdwr_ioctl_data from linux/i2c-dev.h
+    '''
+    _fields_ = [('msgs', ctypes.POINTER(i2c_msg)),
+                ('nmsgs', ctypes.c_uint32)]
+
+
+class kernel_i2c(I_I2C):
+    '''
+    Common part of the interfaces going through the kernel's I2C_RDWR ioctl
+    (i2cdev_i2c and smbus2_i2c): bus recovery, and working out which read of
+    a failed batch was NACK'd. Subclasses open the bus in _reopen() and make
+    a single read in _read_one().
+    '''
+    MAX_READ_BYTES = I2C_RDWR_MAX_BYTES
+    TXN_OVERHEAD_BYTES = I2C_RDWR_MSG_OVERHEAD_BYTES
+
+    def _reopen(self):
+        '''
+        Closes the bus handle, if open, and opens a fresh one
+        '''
+        raise NotImplementedError
+
+    def _read_one(self, request: I2C_ReadRequest):
+        '''
+        Makes a single read in an ioctl call of its own
+        :param request: I2C_ReadRequest
+        :raises: OSError if the ioctl fails
+        '''
+        raise NotImplementedError
+
+    def recover_bus(self):
+        #The kernel driver owns the bus signals, and runs its own recovery
+        #where the adapter supports it. The best that can be done from here is
+        #start over with a fresh handle
+        self._reopen()
+        return None
+
+    def _nack_error(self, requests, ex: OSError):
+        '''
+        Works out which read of a failed batch was NACK'd, by making them one
+        at a time. The kernel only says the ioctl failed, not where
+        :param requests: Sequence of I2C_ReadRequest making up the failed call
+        :param ex: OSError the call failed with
+        :return: I2CNackError for the first read NACK'd, or None if the error
+                 wasn't a NACK or the reads all succeed this time
+        '''
+        if ex.errno not in I2C_NACK_ERRNOS:
+            return None
+        for r in requests:
+            try:
+                self._read_one(r)
+            except OSError as one_ex:
+                if one_ex.errno in I2C_NACK_ERRNOS:
+                    return I2CNackError(r.bus_addr, r.reg_addr, None)
+                raise
+        return None
+
+
+class i2cdev_read_plan:
+    '''
+    The ioctl messages and buffers for a fixed list of reads. Everything is
+    allocated once when the plan is built, so performing the reads again only
+    needs the ioctl calls. The results are views into the plan's receive
+    buffer, and so are overwritten each time the plan is run.
+    '''
+    def __init__(self, requests, max_bytes = I2C_RDWR_MAX_BYTES):
+        '''
+        :param requests: Sequence of I2C_ReadRequest
+        :param max_bytes: Largest number of bytes to read in one message.
+                          Longer reads are split, with the pieces received
+                          back to back so the result is still a single view
+        '''
+        requests, counts = split_read_requests(requests, max_bytes)
+        self.reg_buf = (ctypes.c_uint8 * len(requests))(*[r.reg_addr for r in requests])
+        self.rx_buf = (ctypes.c_uint8 * sum(r.num_bytes for r in requests))()
+        rx_view = memoryview(self.rx_buf).cast('B')
+        reg_base = ctypes.addressof(self.reg_buf)
+        rx_base = ctypes.addressof(self.rx_buf)
+        u8_ptr = ctypes.POINTER(ctypes.c_uint8)
+
+        #Each ioctl call is kept as the ioctl data along with the message array
+        #it points to, so the array stays alive as long as the plan
+        self.calls = []
+        results = []
+        per_call = I2C_RDWR_MAX_MSGS // 2
+        rx_offset = 0
+        for i in range(0, len(requests), per_call):
+            group = requests[i:i + per_call]
+            msgs = (i2c_msg * (2 * len(group)))()
+            for j, r in enumerate(group):
+                dev_addr = (r.bus_addr & 0xFE) >> 1
+                msgs[2*j] = i2c_msg(dev_addr, 0, 1,
+                                    ctypes.cast(reg_base + i + j, u8_ptr))
+                msgs[2*j + 1] = i2c_msg(dev_addr, I2C_M_RD, r.num_bytes,
+                                        ctypes.cast(rx_base + rx_offset, u8_ptr))
+                results.append(rx_offset)
+                rx_offset += r.num_bytes
+            self.calls.append((i2c_rdwr_ioctl_data(msgs, len(msgs)), msgs))
+        results.append(rx_offset)
+
+        #Split reads were received into consecutive parts of the buffer, so
+        #each original request's view just spans all of its pieces
+        if counts is None:
+            counts = [1] * len(requests)
+        self.results = []
+        idx = 0
+        for ct in counts:
+            self.results.append(rx_view[results[idx]:results[idx + ct]])
+            idx += ct
+
+
+class i2cdev_i2c(kernel_i2c):
+    '''
+    Linux /dev/i2c-N implementation of the I_I2C interface class. Reads are
+    made as combined I2C_RDWR transactions (register address write, repeated
+    start, data read), with batches of reads sharing ioctl calls. The message
+    structures and buffers for each distinct batch are built on first use and
+    reused after that.
+    '''
+    def __init__(self, bus_num: int):
+        #Import fcntl here as it only exists on Unix-like systems. Should only
+        #get touched if the class is initialized
+        global _fcntl
+        import fcntl as _fcntl
+        self.__bus_num = bus_num
+        self.__fd = os.open('/dev/i2c-{:d}'.format(bus_num), os.O_RDWR)
+        self.__plans = {}
+        self.__words = {}
+
+    def _reopen(self):
+        os.close(self.__fd)
+        self.__fd = os.open('/dev/i2c-{:d}'.format(self.__bus_num), os.O_RDWR)
+
+    def __plan(self, requests):
+        '''
+        Gets the read plan for the requests, building it on first use
+        :param requests: Sequence of I2C_ReadRequest
+        :return: i2cdev_read_plan
+        '''
+        key = tuple(requests)
+        plan = self.__plans.get(key)
+        if plan is None:
+            plan = i2cdev_read_plan(key, self.MAX_READ_BYTES)
+            if len(self.__plans) >= I2CDEV_PLAN_CACHE_SIZE:
+                self.__plans.clear()
+            self.__plans[key] = plan
+        return plan
+
+    def __word_struct(self, num_words):
+        '''
+        Gets the precompiled little endian unpacker for num_words
+        :param num_words: Number of 16-bit words
+        :return: struct.Struct
+        '''
+        words = self.__words.get(num_words)
+        if words is None:
+            #< for little endian, H for unsigned short
+            words = Struct('<{:d}H'.format(num_words))
+            self.__words[num_words] = words
+        return words
+
+    def __read(self, bus_addr: int, reg_addr: int, num_bytes: int):
+        return self.i2c_read_batch((I2C_ReadRequest(bus_addr, reg_addr, num_bytes),))[0]
+
+    def i2c_read_words(self, bus_addr:int , reg_addr: int, num_words: int):
+        return self.__word_struct(num_words).unpack(self.__read(bus_addr, reg_addr, num_words * 2))
+
+    def sbs_block_read(self, bus_addr: int, reg_addr: int, num_bytes: int):
+        return bytes(self.__read(bus_addr, reg_addr, num_bytes))
+
+    def sbs_word_read(self, bus_addr: int, reg_addr: int):
+        return self.__word_struct(1).unpack(self.__read(bus_addr, reg_addr, 2))[0]
+
+    def __run(self, requests):
+        plan = self.__plan(requests)
+        for data, _ in plan.calls:
+            _fcntl.ioctl(self.__fd, I2C_RDWR, data)
+        return plan.results
+
+    def _read_one(self, request: I2C_ReadRequest):
+        self.__run((request,))
+
+    def i2c_read_batch(self, requests):
+        #Results are views into the plan's receive buffer, valid until the
+        #same reads are made again
+        try:
+            return self.__run(requests)
+        except OSError as ex:
+            nack = self._nack_error(requests, ex)
+            if nack is None:
+                raise
+            raise nack from ex
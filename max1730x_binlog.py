@@ -0,0 +1,142 @@
+#
+# Compact binary alternative to the CSV log. A self-describing header is
+# followed by fixed size records, so record N can be found directly.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+# File layout, all little endian:
+#   Preamble:   BINLOG_MAGIC, uint32 format version, uint32 header length
+#   Header:     UTF-8 JSON (see binary_log_writer), space padded so the
+#               records start on an 8 byte boundary
+#   Records:    int64 timestamp in ns since the Epoch
+#               uint16 value of each word column, in column order
+#               bytes of each SBS block column, in column order, as read
+#               (length byte first) and zero padded to the block size
+#               Validity bitmap, bit n (LSB first) set if column n has a value
+#
+import max1730x_regs
+from datetime import datetime
+from struct import Struct
+import json
+
+BINLOG_MAGIC = b'M1730LOG'
+BINLOG_VERSION = 1
+
+#Preamble following the magic: format version and header length
+BINLOG_PREAMBLE = Struct('<II')
+
+#Records start on a multiple of this from the start of the file
+BINLOG_ALIGN = 8
+
+
+def record_format(columns: list):
+    '''
+    Builds the struct format of a record from the header's columns
+
+    :param columns: List of column dicts, as in the header
+    :return: struct format string
+    '''
+    words = sum(1 for c in columns if c['type'] == 'word')
+    blocks = ''.join('{:d}s'.format(c['size']) for c in columns if c['type'] == 'block')
+    return '<q{:d}H{}{:d}s'.format(words, blocks, (len(columns) + 7) // 8)
+
+
+class binary_log_writer:
+    '''
+    Writes logged rows as fixed size binary records, two bytes per register
+    rather than the five of a CSV field. The header describes the columns
+    (register names and addresses from max1730x_regs), the record layout, the
+    schema hash of the register map and whatever is known about the device.
+
+    Values which weren't read (None in the row, or an unsupported SBS
+    register) are written as zeros with their validity bit clear.
+    '''
+    def __init__(self, output_file, registers: list, sbs_registers: list,
+                 device: dict = None, interval: float = None):
+        '''
+        :param output_file: File opened for binary writing
+        :param registers: List of PlanRegister being logged, in column order
+        :param sbs_registers: List of SBS_Register, after the registers
+        :param device: Dictionary of device details for the header, e.g. the
+                       interface and DevName. Must be JSON serializable
+        :param interval: Logging interval in seconds, for the header
+        '''
+        self.__file = output_file
+        self.columns = [{'name' : r.name, 'addr' : r.addr, 'dev_addr' : r.dev_addr,
+                         'type' : 'word', 'size' : 2} for r in registers]
+        self.columns += [{'name' : max1730x_regs.sbs_column(sbs), 'addr' : sbs.base_addr,
+                          'dev_addr' : sbs.dev_addr,
+                          'type' : 'block' if sbs.block_size > 0 else 'word',
+                          'size' : sbs.block_size if sbs.block_size > 0 else 2}
+                         for sbs in sbs_registers]
+        self.record = Struct(record_format(self.columns))
+        self.header = {'format_version' : BINLOG_VERSION,
+                       'schema_hash' : max1730x_regs.REGISTER_DB.schema_hash,
+                       'created' : datetime.now().astimezone().isoformat(),
+                       'device' : device or {},
+                       'interval' : interval,
+                       'record_format' : self.record.format,
+                       'record_size' : self.record.size,
+                       'columns' : self.columns}
+        self.__words = [idx for idx, c in enumerate(self.columns) if c['type'] == 'word']
+        self.__blocks = [idx for idx, c in enumerate(self.columns) if c['type'] == 'block']
+        self.__bitmap_bytes = (len(self.columns) + 7) // 8
+
+    def write_header(self):
+        '''
+        Writes the preamble and header. Must be called before any rows
+        '''
+        header = json.dumps(self.header, separators = (',', ':')).encode('utf-8')
+        pad = -(len(BINLOG_MAGIC) + BINLOG_PREAMBLE.size + len(header)) % BINLOG_ALIGN
+        header += b' ' * pad
+        self.__file.write(BINLOG_MAGIC + BINLOG_PREAMBLE.pack(BINLOG_VERSION, len(header)) + header)
+
+    def write_row(self, timestamp_ns: int, values: list):
+        '''
+        Writes a row as a record
+
+        :param timestamp_ns: Time of the snapshot, in ns since the Epoch
+        :param values: Values in column order, as returned by tiered_plan.poll()
+        '''
+        valid = 0
+        for idx, v in enumerate(values):
+            if (v is not None) and (type(v) is not str):
+                valid |= 1 << idx
+        fields = [timestamp_ns]
+        fields.extend(values[idx] if (valid >> idx) & 1 else 0 for idx in self.__words)
+        fields.extend(values[idx] if (valid >> idx) & 1 else b'' for idx in self.__blocks)
+        fields.append(valid.to_bytes(self.__bitmap_bytes, 'little'))
+        self.__file.write(self.record.pack(*fields))
+
+
+def read_header(input_file, check_schema: bool = True):
+    '''
+    Reads the header of a binary log
+
+    :param input_file: File opened for binary reading, at the start
+    :param check_schema: Flag to reject a log written against a different
+                         register map, where the column names may not mean
+                         the same registers
+    :return: Tuple of the header dict, and the file offset of the first record
+    :raises: ValueError if the file isn't a binary log of a known version, or
+             is from a different register map
+    '''
+    preamble = input_file.read(len(BINLOG_MAGIC) + BINLOG_PREAMBLE.size)
+    if (len(preamble) < len(BINLOG_MAGIC) + BINLOG_PREAMBLE.size) or \
+       not preamble.startswith(BINLOG_MAGIC):
+        raise ValueError('Not a MAX1730x binary log')
+    version, header_len = BINLOG_PREAMBLE.unpack(preamble[len(BINLOG_MAGIC):])
+    if version != BINLOG_VERSION:
+        raise ValueError('Unsupported binary log version {:d}'.format(version))
+    header = json.loads(input_file.read(header_len).decode('utf-8'))
+    if check_schema and (header.get('schema_hash') != max1730x_regs.REGISTER_DB.schema_hash):
+        raise ValueError('Binary log is from a different register map (schema {})'.format(
+                         header.get('schema_hash')))
+    return header, len(preamble) + header_len
@@ -0,0 +1,135 @@
+#
+# Compressed output for the logs. The data is compressed a block at a time,
+# each block a complete stream of its own, so everything up to the last block
+# written can be read back even if the logger never got to close the file.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+#Compression methods, by the file extension they're written with. gzip, xz and
+#bzip2 all read concatenated streams back as one, as do the Python modules
+COMPRESS_GZ = 'gz'
+COMPRESS_XZ = 'xz'
+COMPRESS_BZ2 = 'bz2'
+COMPRESS_MODULES = {COMPRESS_GZ : gzip, COMPRESS_XZ : lzma, COMPRESS_BZ2 : bz2}
+COMPRESS_METHODS = list(COMPRESS_MODULES.keys())
+
+#Default amount of data compressed and written out at a time, in bytes. This
+#is also the most which can be lost if the logger stops without closing the file
+COMPRESS_BLOCK_SIZE = 256 * 1024
+
+
+def compress_method(path: str):
+    '''
+    Gets the compression method a file name implies, from its extension
+
+    :param path: File name
+    :return: One of COMPRESS_METHODS, or None if it isn't compressed
+    '''
+    ext = os.path.splitext(path)[1].lower()[1:]
+    return ext if ext in COMPRESS_MODULES else None
+
+
+def open_compressed(path: str, mode: str = 'rb'):
+    '''
+    Opens a file for reading, decompressing it if its extension says it's
+    compressed
+
+    :param path: File name
+    :param mode: 'rb' or 'rt'. Text is read as UTF-8, with newlines as is
+    :return: File object
+    '''
+    method = compress_method(path)
+    if method is None:
+        return open(path, mode, newline = '', encoding = 'utf-8') if 't' in mode else open(path, mode)
+    if 't' in mode:
+        return COMPRESS_MODULES[method].open(path, mode, newline = '', encoding = 'utf-8')
+    return COMPRESS_MODULES[method].open(path, mode)
+
+
+class block_compressed_file(io.RawIOBase):
+    '''
+    Binary file object which compresses what's written to it a block at a
+    time. Each block is compressed as a complete stream (a gzip member, xz
+    stream or bzip2 stream) then written out and synced to the disk, so a
+    crash loses at most the block being gathered. Standard tools read the
+    blocks back as one file.
+
+    The compression happens in write(), so in whichever thread writes.
+    '''
+    def __init__(self, path: str, method: str, block_size: int = COMPRESS_BLOCK_SIZE):
+        '''
+        :param path: File name to write
+        :param method: One of COMPRESS_METHODS
+        :param block_size: Number of bytes to gather before compressing them
+        '''
+        super().__init__()
+        if method not in COMPRESS_MODULES:
+            raise ValueError('{} is not a compression method'.format(method))
+        self.__compress = COMPRESS_MODULES[method].compress
+        self.__block_size = max(1, block_size)
+        self.__buffer = bytearray()
+        self.__file = open(path, 'wb')
+        self.blocks = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.__buffer += data
+        if len(self.__buffer) >= self.__block_size:
+            self.__write_block()
+        return len(data)
+
+    def __write_block(self):
+        '''
+        Compresses the gathered data and writes it out as a block
+        '''
+        if self.__buffer:
+            self.__file.write(self.__compress(bytes(self.__buffer)))
+            self.__file.flush()
+            os.fsync(self.__file.fileno())
+            self.__buffer.clear()
+            self.blocks += 1
+
+    def close(self):
+        #Whatever is left goes out as a last, shorter, block
+        if not self.closed:
+            try:
+                self.__write_block()
+            finally:
+                self.__file.close()
+        super().close()
+
+
+def open_output(path: str, binary: bool, method: str = None,
+                block_size: int = COMPRESS_BLOCK_SIZE):
+    '''
+    Opens a log file for writing, compressed or not
+
+    :param path: File name
+    :param binary: Flag to open for binary rather than text. Text is written
+                   as UTF-8, with newlines as is for the CSV writer
+    :param method: One of COMPRESS_METHODS, or None to write it uncompressed
+    :param block_size: Number of bytes compressed at a time
+    :return: File object
+    '''
+    if method is None:
+        return open(path, 'wb') if binary else open(path, 'w', newline = '', encoding = 'utf-8')
+    raw = block_compressed_file(path, method, block_size)
+    if binary:
+        return raw
+    #Write through, so rows don't sit in the text layer outside of the blocks
+    return io.TextIOWrapper(raw, encoding = 'utf-8', newline = '', write_through = True)
@@ -18,120 +18,406 @@ import io
 import time
 import max1730x_regs
 from datetime import datetime
-from i2c_iface import I_I2C
+from i2c_iface import I_I2C, I2C_MIN_CLOCK, I2C_MAX_CLOCK
 from smbus2_iface import smbus2_i2c
+from i2cdev_iface import i2cdev_i2c
 from ftd2xx_iface import ftd2xx_i2c
+from pylibftdi_iface import pylibftdi_i2c
+from ftdi_emulator import emulator_i2c
+from max1730x_sbs import SBS_DERIVATIONS
+from max1730x_sched import tick_scheduler, SCHED_SKIP, SCHED_POLICIES
+from max1730x_binlog import binary_log_writer
+from max1730x_compress import open_output, compress_method, COMPRESS_METHODS, \
+                              COMPRESS_BLOCK_SIZE
+from max1730x_writer import log_writer, LogWriterError, WRITER_QUEUE_SIZE, \
+                            BACKPRESSURE_BLOCK, BACKPRESSURE_POLICIES
+from max1730x_plan import read_plan, tiered_plan, select_registers, default_tier, \
+                          TIER_FAST, TIER_SLOW, TIER_ONCE
 ####
-# Note: While likely not necessary, to save on some unnecessary dictionaries or
-# data frames, the register data is pulled in and written to the CSV
-# sequentially based on the order of the register maps.  This same ordering is
-# used to generate the CSV headers. An alternate approach would be store each
-# read block into a dictionary or data frame and have the CSV written from there.
-# The application is simple enough this approach should be just fine. Just be
-# mindful to change both the header generation and data capture order if changes
-# occur.
+# Note: The register data is pulled in and written to the CSV sequentially based
+# on the order of the register maps. The read plan (max1730x_plan) works out
+# the reads to make and where each result lands in the row, and the CSV headers
+# come from the same plan, so the two always line up.
 
 
 # Dictionary of possible interface names and the classes
-INTERFACE_DICT = { 'smbus2' : smbus2_i2c,
-                   'ftdi'   : ftd2xx_i2c}
+INTERFACE_DICT = { 'smbus2'    : smbus2_i2c,
+                   'i2cdev'    : i2cdev_i2c,
+                   'ftdi'      : ftd2xx_i2c,
+                   'pylibftdi' : pylibftdi_i2c,
+                   'emulator'  : emulator_i2c}
 
 #Status interval in seconds
 STATUS_INTERVAL = 30
 
-def get_header_fields(keep_rsvd: bool):
+#Output file formats. The format follows the file extension unless given
+LOG_FORMAT_CSV = 'csv'
+LOG_FORMAT_BIN = 'bin'
+LOG_FORMATS = [LOG_FORMAT_CSV, LOG_FORMAT_BIN]
+
+#Default poll period of the slow (NV) registers, in seconds. Tiering is off by
+#default, so every value in a row was read for that row
+SLOW_TIME = 0.0
+
+#Register summing the NV block, read every interval to spot NV changes when
+#--nv-checksum is given
+NV_CHECKSUM_REG = 0x1DF
+
+#Default number of consecutive failed snapshots before attempting bus recovery
+RECOVER_AFTER = 3
+
+#Clock rates stepped through when auto-probing the bus clock, and the number of
+#reads of the probe register which must all match at each rate
+CLOCK_PROBE_RATES = [100000, 200000, 300000, 400000]
+CLOCK_PROBE_READS = 20
+
+#Number of reads averaged when measuring the per-transaction latency
+LATENCY_PROBE_READS = 20
+
+#Register read while probing the clock and measuring latency. DevName is fixed
+#for a given part, so any change between reads is a bus error
+PROBE_REG = 0x021
+
+def get_read_plan(keep_rsvd: bool = False, bus_dev: I_I2C = None,
+                  regs: list = None):
+    '''
+    Function to provide the read plan for a snapshot of the device: which reads
+    to make, and how their results map to the CSV columns. The columns follow
+    the order of the register lists from the regs package.
+
+    :param keep_rsvd: Flag to also store Reserved register data
+    :param bus_dev: I2C Bus instance the plan is for, to fit the reads to its
+                    limits and costs. None uses the I_I2C defaults
+    :param regs: List of register names or addresses to log, as accepted by
+                 max1730x_plan.select_registers(). None logs all of them
+    :return: read_plan
+    '''
+    iface = bus_dev if bus_dev is not None else I_I2C
+    registers, sbs_registers = select_registers(regs, keep_rsvd)
+    return read_plan(registers, sbs_registers,
+                     iface.MAX_READ_BYTES, iface.TXN_OVERHEAD_BYTES)
+
+
+def get_tiered_plan(keep_rsvd: bool = False, bus_dev: I_I2C = None,
+                    regs: list = None, slow_time: float = SLOW_TIME,
+                    slow_regs: list = None, nv_checksum: bool = False,
+                    derive_sbs: bool = False, verify_time: float = None):
     '''
-    Function to provide a list of the column headers for the CSV file. The order
-    of the fields is based on the order of the register lists from the regs
-    package. This same ordering needs to be followed during actual data capture.
+    Function to provide the polling tiers for logging the device, splitting the
+    read plan (see get_read_plan()) into registers read every interval, the NV
+    registers read every slow_time seconds and the pack identity read once.
 
     :param keep_rsvd: Flag to also store Reserved register data
-    :return: List of header fields (strs)
+    :param bus_dev: I2C Bus instance the plan is for. None uses the I_I2C
+                    defaults
+    :param regs: List of register names or addresses to log. None logs all
+                 of them
+    :param slow_time: Poll period of the slow registers in seconds. 0 reads
+                      every register every interval
+    :param slow_regs: List of register names or addresses to also poll slowly,
+                      rather than every interval
+    :param nv_checksum: Flag to read nCheckSum every interval, and re-read the
+                        NV registers as soon as it changes
+    :param derive_sbs: Flag to work out the SBS registers mirroring M5
+                       registers (see max1730x_sbs) rather than reading them.
+                       Only done where the M5 registers are also logged
+    :param verify_time: How often to read the derived SBS registers for real,
+                        to check them, in seconds. None never does
+    :return: tiered_plan
     '''
-    hdrfields = ['Timestamp']
-    for page in max1730x_regs.REGISTER_PAGES:
-        for idx,r in enumerate(page.reg_names):
-            if keep_rsvd and (r == None):
-                hdrfields.append('RSVD_{:03X}'.format(page.base_addr + idx))
-            elif r != None:
-                hdrfields.append(r + '_{:03X}'.format(page.base_addr + idx))
+    iface = bus_dev if bus_dev is not None else I_I2C
+    registers, sbs_registers = select_registers(regs, keep_rsvd)
+    periods = None
+    if slow_time > 0:
+        periods = {TIER_FAST : 0, TIER_SLOW : slow_time, TIER_ONCE : None}
+    slow_set = set()
+    if slow_regs:
+        slow_pages, slow_sbs = select_registers(slow_regs)
+        slow_set = set(slow_pages) | set(slow_sbs)
+    def tier_of(reg):
+        tier = default_tier(reg)
+        return TIER_SLOW if (tier == TIER_FAST) and (reg in slow_set) else tier
+    watch = None
+    if nv_checksum:
+        watch = {TIER_SLOW : select_registers([NV_CHECKSUM_REG])[0]}
+    derived = {}
+    if derive_sbs:
+        by_addr = {r.addr : r for r in registers}
+        for sbs in sbs_registers:
+            if sbs.base_addr in SBS_DERIVATIONS:
+                sources, fn = SBS_DERIVATIONS[sbs.base_addr]
+                if all(addr in by_addr for addr in sources):
+                    derived[sbs] = ([by_addr[addr] for addr in sources], fn)
+    return tiered_plan(registers, sbs_registers, periods, tier_of,
+                       max_read_bytes = iface.MAX_READ_BYTES,
+                       txn_overhead_bytes = iface.TXN_OVERHEAD_BYTES,
+                       watch = watch, derived = derived,
+                       verify_period = verify_time)
 
-    for sbs in max1730x_regs.SBS_REGISTERS:
-        hdrfields.append(sbs.reg_name + '_{:03X}'.format(sbs.base_addr))
 
-    return hdrfields
+def get_read_requests(keep_rsvd: bool = False, bus_dev: I_I2C = None,
+                      regs: list = None):
+    '''
+    Function to provide the list of reads making up a single snapshot of the
+    device, from the read plan (see get_read_plan()).
+
+    :param keep_rsvd: Flag to also store Reserved register data
+    :param bus_dev: I2C Bus instance the reads are for
+    :param regs: List of registers to log. None logs all of them
+    :return: List of I2C_ReadRequest
+    '''
+    return get_read_plan(keep_rsvd, bus_dev, regs).requests
+
+
+def get_device_info(bus_dev: I_I2C):
+    '''
+    Function to provide what can be found out about the device and interface,
+    for the binary log header. Anything which can't be read is left out.
+
+    :param bus_dev: I2C Bus instance
+    :return: Dictionary of device details
+    '''
+    info = {'interface' : type(bus_dev).__name__}
+    try:
+        info['dev_name'] = bus_dev.i2c_read_words(max1730x_regs.M5_DEV_ADDR, PROBE_REG, 1)[0]
+    except Exception:
+        pass
+    try:
+        info['clock_hz'] = bus_dev.get_clock()
+    except Exception:
+        pass
+    return info
+
+
+def recover_bus(bus_dev: I_I2C):
+    '''
+    Runs the interface's bus recovery, reporting how long it took and whether
+    the bus was released.
+
+    :param bus_dev: I2C Bus instance
+    :return: Result of the interface's recover_bus()
+    '''
+    start = time.perf_counter()
+    released = bus_dev.recover_bus()
+    elapsed = time.perf_counter() - start
+    state = {True : 'bus released', False : 'bus still held', None : 'done'}[released]
+    print('Bus recovery: {} in {:.1f} ms'.format(state, elapsed * 1000))
+    return released
+
+
+def format_row(timestamp_ns: int, values: list, ms_stamps: bool = False):
+    '''
+    Formats a snapshot into a row of the CSV file. The row starts with the
+    timestamp, just Epoch time in seconds, down to the ms if ms_stamps is set.
+    Registers are formatted as 16-bit hex, SBS blocks as a hex string. Values
+    which couldn't be worked out are left empty, and SBS registers the device
+    doesn't support are marked as such.
+
+    :param timestamp_ns: Time of the snapshot, in ns since the Epoch
+    :param values: Values as returned by tiered_plan.poll()
+    :param ms_stamps: Flag to include ms in the timestamp
+    :return: List of fields (strs)
+    '''
+    if ms_stamps:
+        row_data = ['{:.3f}'.format(timestamp_ns / 1e9)]
+    else:
+        row_data = [str(timestamp_ns // 1000000000)]
+    for v in values:
+        if v is None:
+            row_data.append('')
+        elif type(v) is int:
+            row_data.append('{:04X}'.format(v))
+        elif type(v) is str:
+            row_data.append(v)
+        else:
+            row_data.append(v.hex().upper())
+    return row_data
 
 
 def start_logging(output_file: io.TextIOBase,  bus_dev: I_I2C,
                   quit_on_error: bool = False, interval:float = 5.0,
-                  keep_rsvd:bool = False):
+                  keep_rsvd:bool = False, recover_after: int = RECOVER_AFTER,
+                  regs: list = None, slow_time: float = SLOW_TIME,
+                  slow_regs: list = None, nv_checksum: bool = False,
+                  derive_sbs: bool = False, verify_time: float = None,
+                  overrun: str = SCHED_SKIP, queue_size: int = WRITER_QUEUE_SIZE,
+                  backpressure: str = BACKPRESSURE_BLOCK,
+                  log_format: str = LOG_FORMAT_CSV):
     '''
     Performs the actual logging loop. Generates and writes the CSV headers,
     then periodically (based on the interval) collects the register data and
     writes it to a file.  The loop will terminate on a KeyboardInterrupt.
+    Snapshots are paced by a tick_scheduler, so the interval doesn't drift,
+    and the rows are formatted and written by a log_writer thread, so output
+    stalls don't delay the bus reads.
+    The loop also stops if the output can no longer be written.
     If a I2C error (or other exception occurs), optionally the loop can exit, or
-    continue trying to execute.
+    continue trying to execute. When continuing, the interface's bus recovery
+    is run after recover_after snapshots in a row have failed.
 
-    :param output_file: Opened file descriptor to write the data to
+    :param output_file: Opened file descriptor to write the data to. Text
+                        for CSV, binary for the binary format
     :param bus_dev: I2C Bus instance
     :param quit_on_error: Determines if the loop should quit on any non-keyboard
                           exception
     :param interval: Collection interval in seconds
     :param keep_rsvd: Flag to capture Reserved registers as well
+    :param recover_after: Number of consecutive failed snapshots before
+                          attempting bus recovery. 0 disables recovery
+    :param regs: List of register names or addresses to log (see
+                 max1730x_plan.select_registers()). None logs all of them
+    :param slow_time: Poll period of the slow (NV) registers in seconds. Their
+                      last values are repeated in the rows in between. 0 reads
+                      every register every interval
+    :param slow_regs: List of register names or addresses to also poll at the
+                      slow period
+    :param nv_checksum: Flag to watch nCheckSum every interval, re-reading the
+                        NV registers when it changes rather than only every
+                        slow_time seconds
+    :param derive_sbs: Flag to work out the SBS registers mirroring logged M5
+                       registers, rather than reading them
+    :param verify_time: How often to read the derived SBS registers for real
+                        and report any mismatches, in seconds. None never does
+    :param overrun: What to do when a snapshot overruns past the next one, one
+                    of max1730x_sched.SCHED_POLICIES
+    :param queue_size: Number of rows which can be waiting to be written
+    :param backpressure: What to do when the rows are logged faster than they
+                         can be written, one of
+                         max1730x_writer.BACKPRESSURE_POLICIES
+    :param log_format: Output format, one of LOG_FORMATS
     '''
-    csv_wr = csv.writer(output_file)
-    csv_wr.writerow(get_header_fields(keep_rsvd))
+    sched = tick_scheduler(interval, overrun)
+    plan = get_tiered_plan(keep_rsvd, bus_dev, regs, slow_time, slow_regs, nv_checksum,
+                           derive_sbs, verify_time)
+    if log_format == LOG_FORMAT_BIN:
+        bin_wr = binary_log_writer(output_file, plan.registers, plan.sbs_registers,
+                                   get_device_info(bus_dev), interval)
+        bin_wr.write_header()
+        write_row = lambda row: bin_wr.write_row(*row)
+    else:
+        csv_wr = csv.writer(output_file)
+        csv_wr.writerow(['Timestamp'] + plan.columns)
+        ms_stamps = interval < 1.0
+        write_row = lambda row: csv_wr.writerow(format_row(*row, ms_stamps))
+    writer = log_writer(write_row, queue_size, backpressure)
     record_ct = 0
+    error_ct = 0
+    fail_ct = 0
+    recovery_ct = 0
+    late_max = 0
     status_time = 0
     while True:
         try:
-            #Current time stamp, and when the next interval should occur
-            now_time = time.time()
-            next_time = now_time + interval
-
-            #The row data starts with timestamp. Just use Epoch time in seconds
-            row_data = [str(int(now_time))]
-
-            #Do the register pages first
-            for page in max1730x_regs.REGISTER_PAGES:
-                reg_data = bus_dev.i2c_read_words(page.dev_addr, page.base_addr & 0xFF, 16)
-                if keep_rsvd:
-                    row_data += ['{:04X}'.format(w) for w in reg_data]
-                else:
-                    row_data += ['{:04X}'.format(w) for idx,w in enumerate(reg_data) if page.reg_names[idx] != None]
-
-            #SBS Registers
-            for sbs in max1730x_regs.SBS_REGISTERS:
-                if sbs.block_size > 0:
-                    #For block reads, the data is a bit Hex string
-                    reg_data = bus_dev.sbs_block_read(sbs.dev_addr, sbs.base_addr & 0xFF, sbs.block_size)
-                    row_data.append(''.join(['{:02X}'.format(r) for r in reg_data]))
-                else:
-                    #For words, same as a normal 16-bit register
-                    row_data.append('{:04X}'.format(bus_dev.sbs_word_read(sbs.dev_addr, sbs.base_addr & 0xFF)))
-
-            #Write it to the CSV file
-            csv_wr.writerow(row_data)
+            #Wait for the next snapshot. The schedule and polling tiers run on
+            #the monotonic clock, only the time stamp comes from the wall clock.
+            #Keep track of how late the ticks are, to show how far behind
+            #catching up has got
+            late_max = max(late_max, sched.wait())
+            now_ns = time.time_ns()
+            poll_time = time.monotonic()
+
+            #Read the tiers which are due in one go, letting the interface
+            #pipeline the transactions where it can
+            values = plan.poll(bus_dev, poll_time)
+            for name, derived, read in plan.mismatches:
+                print('SBS check: {} derived as {} but read as {:04X}'.format(
+                      name, 'nothing' if derived is None else '{:04X}'.format(derived), read))
+
+            #Hand the row over to be formatted and written. The values are
+            #updated in place by the next poll, so pass a copy
+            writer.put((now_ns, tuple(values)))
             record_ct += 1
+            fail_ct = 0
 
             #Some simple status to let the user know its still running
-            if now_time > status_time:
-                print('{:d} Records Logged...'.format(record_ct))
-                status_time = now_time + STATUS_INTERVAL
-
-            #Simple periodic loop, accounting for time spent doing work
-            delay = next_time - time.time()
-            if delay > 0:
-                time.sleep(delay)
+            if poll_time > status_time:
+                iface_stats = ''.join(', {:d} {}'.format(v, k) for k, v in bus_dev.get_stats().items())
+                jitter_avg, jitter_max = sched.jitter_stats()
+                print('{:d} Records Logged, {:d} Errors, {:d} Bus Recoveries, {:d} Missed Ticks, '
+                      'Up To {:d} Ticks Late, Jitter {:.2f}/{:.2f} ms avg/max, '
+                      '{:d}/{:d} Rows Queued (max {:d}), {:d} Rows Dropped{}...'.format(
+                      record_ct, error_ct, recovery_ct, sched.missed, late_max,
+                      jitter_avg * 1000, jitter_max * 1000, writer.depth(), writer.queue_size,
+                      writer.max_depth, writer.dropped, iface_stats))
+                status_time = poll_time + STATUS_INTERVAL
+                late_max = 0
 
         except KeyboardInterrupt:
             #Always exit on a keyboard interrupt
             print('User interrupt via Keyboard')
             break
+        except LogWriterError as ex:
+            #Nothing more can be logged, and it's not the bus's fault
+            print('Stopping: ' + str(ex))
+            break
         except Exception as ex:
             print('Exception: ' + str(ex))
             if(quit_on_error):
                 break
+            error_ct += 1
+            fail_ct += 1
+            if recover_after and (fail_ct >= recover_after):
+                fail_ct = 0
+                try:
+                    recover_bus(bus_dev)
+                    recovery_ct += 1
+                except NotImplementedError:
+                    print('Bus recovery is not supported by this interface')
+                    recover_after = 0
+                except Exception as rec_ex:
+                    print('Bus recovery failed: ' + str(rec_ex))
+
+    #Let the writer finish off whatever is still queued
+    writer.close()
+
+
+def probe_bus_clock(bus_dev: I_I2C, rates: list = CLOCK_PROBE_RATES,
+                    num_reads: int = CLOCK_PROBE_READS):
+    '''
+    Finds the fastest stable clock rate for the bus. Steps up through the rates,
+    reading the probe register repeatedly at each one, and stops at the first
+    rate where a read fails or returns something different from the reads at
+    the slowest rate. The bus is left at the fastest rate that passed.
+
+    :param bus_dev: I2C Bus instance
+    :param rates: Clock rates to try in Hz, slowest first
+    :param num_reads: Number of reads to validate at each rate
+    :return: Selected clock rate in Hz
+    :raises: IOError if none of the rates worked
+    '''
+    ref_value = None
+    best_rate = None
+    for rate in rates:
+        bus_dev.set_clock(rate)
+        try:
+            values = [bus_dev.i2c_read_words(max1730x_regs.M5_DEV_ADDR, PROBE_REG, 1)[0]
+                      for _ in range(num_reads)]
+        except Exception:
+            break
+        if ref_value is None:
+            ref_value = values[0]
+        if any(v != ref_value for v in values):
+            break
+        best_rate = rate
+
+    if best_rate is None:
+        raise IOError('No stable I2C clock rate found')
+    return bus_dev.set_clock(best_rate)
+
+
+def measure_transaction_latency(bus_dev: I_I2C, num_reads: int = LATENCY_PROBE_READS):
+    '''
+    Measures the average time taken by a single register read, including all
+    of the USB or driver overhead involved.
+
+    :param bus_dev: I2C Bus instance
+    :param num_reads: Number of reads to average over
+    :return: Average time per read, in seconds
+    '''
+    start = time.perf_counter()
+    for _ in range(num_reads):
+        bus_dev.i2c_read_words(max1730x_regs.M5_DEV_ADDR, PROBE_REG, 1)
+    return (time.perf_counter() - start) / num_reads
 
 
 def arg_check_interface(value: str):
@@ -148,6 +434,101 @@ def arg_check_interface(value: str):
     return INTERFACE_DICT[str(value).lower()]
 
 
+def arg_check_regs(value: str):
+    '''
+    Performs an argument check for the register selection option. Registers
+    are given by name or hex address, separated by commas
+
+    :param value: Input string from the user
+    :return: List of register names/addresses
+    :raises: ArgumentTypeError on an unknown register
+    '''
+    regs = [r.strip() for r in value.split(',') if r.strip()]
+    try:
+        select_registers(regs)
+    except ValueError as ex:
+        raise argparse.ArgumentTypeError(str(ex))
+    return regs
+
+
+def arg_check_regs_file(value: str):
+    '''
+    Performs an argument check for the register selection file option. The
+    file lists registers as per arg_check_regs(), separated by commas or
+    whitespace. Anything after a # on a line is a comment
+
+    :param value: File name from the user
+    :return: List of register names/addresses
+    :raises: ArgumentTypeError if the file can't be read or has an unknown
+             register
+    '''
+    try:
+        with open(value, 'r', encoding='utf-8') as regs_file:
+            lines = [line.split('#', 1)[0] for line in regs_file]
+    except OSError as ex:
+        raise argparse.ArgumentTypeError(str(ex))
+    return arg_check_regs(','.join(','.join(line.split()) for line in lines))
+
+
+def arg_check_clock(value: str):
+    '''
+    Performs an argument check for the clock option. Accepts 'auto', or a rate
+    in Hz with an optional k or M suffix (e.g. 400k), within I2C_MIN_CLOCK to
+    I2C_MAX_CLOCK
+
+    :param value: Input string from the user
+    :return: Clock rate in Hz, or 'auto'
+    :raises: ArgumentTypeError on an invalid rate
+    '''
+    value = value.strip().lower()
+    if value == 'auto':
+        return value
+    scale = {'k' : 1000, 'm' : 1000000}.get(value[-1:], 1)
+    try:
+        rate = int(float(value.rstrip('km')) * scale)
+    except ValueError:
+        rate = 0
+    if not (I2C_MIN_CLOCK <= rate <= I2C_MAX_CLOCK):
+        raise argparse.ArgumentTypeError('%s is not a valid clock rate (%dk-%dk)' %
+                                         (value, I2C_MIN_CLOCK // 1000, I2C_MAX_CLOCK // 1000))
+    return rate
+
+
+def arg_check_latency(value: str):
+    '''
+    Performs an argument check for the USB latency timer option
+
+    :param value: Input string from the user
+    :return: Latency timer in ms
+    :raises: ArgumentTypeError on an invalid value
+    '''
+    try:
+        latency = int(value)
+    except ValueError:
+        latency = 0
+    if not (1 <= latency <= 255):
+        raise argparse.ArgumentTypeError('%s is not a valid latency (1-255 ms)' % value)
+    return latency
+
+
+def arg_check_transfer_size(value: str):
+    '''
+    Performs an argument check for the USB transfer size options
+
+    :param value: Input string from the user
+    :return: Transfer size in bytes
+    :raises: ArgumentTypeError on an invalid size
+    '''
+    try:
+        size = int(value)
+    except ValueError:
+        size = 0
+    if (size < 64) or (size > 65536) or (size % 64):
+        raise argparse.ArgumentTypeError('%s is not a valid transfer size '
+                                         '(multiple of 64, 64-65536)' % value)
+    return size
+
+
 if __name__ == '__main__':
     #Generate a default file name based on the current date and time
     def_out_file = datetime.now().strftime('max1730x_log_%Y-%m-%d_%H%M%S.csv')
@@ -157,7 +538,7 @@ if __name__ == '__main__':
         def_iface = 'ftdi'
         def_bus = 1
     else:
-        def_iface = 'smbus2'
+        def_iface = 'i2cdev'
         def_bus = 6
 
     #Accept some user arguments
@@ -173,20 +554,120 @@ if __name__ == '__main__':
                         help='I2C bus number for the interface.')
     parser.add_argument('-o', '--output', dest='out_file',
                         type=str, default=def_out_file,
-                        help='File name for the output CSV')
+                        help='File name for the output log')
+    parser.add_argument('-f', '--format', dest='log_format',
+                        choices=LOG_FORMATS, default=None,
+                        help='Output format: csv, or bin for the compact binary '
+                             'format. Defaults to going by the file extension.')
+    parser.add_argument('--compress', dest='compress',
+                        choices=COMPRESS_METHODS, default=None,
+                        help='Compress the output as it\'s written, adding the '
+                             'extension to the file name if needed. Defaults to '
+                             'going by the file extension (e.g. .csv.gz).')
+    parser.add_argument('--compress-block', dest='compress_block',
+                        type=int, default=COMPRESS_BLOCK_SIZE // 1024,
+                        help='Amount of output compressed and written at a time, '
+                             'in KB. At most this much is lost if the logger is '
+                             'stopped abruptly.')
+    parser.add_argument('-c', '--clock', dest='clock',
+                        type=arg_check_clock, default=None,
+                        help='I2C clock rate in Hz, 10k-400k (e.g. 100k), or auto to '
+                             'probe for the fastest stable rate. Defaults to '
+                             'the interface\'s own setting.')
+    parser.add_argument('--latency', dest='latency',
+                        type=arg_check_latency, default=None,
+                        help='USB latency timer in ms (USB interfaces only)')
+    parser.add_argument('--usb-in', dest='usb_in',
+                        type=arg_check_transfer_size, default=None,
+                        help='USB IN transfer size in bytes (USB interfaces only)')
+    parser.add_argument('--usb-out', dest='usb_out',
+                        type=arg_check_transfer_size, default=None,
+                        help='USB OUT transfer size in bytes (USB interfaces only)')
+    parser.add_argument('--usb-auto', dest='usb_auto', action='store_true',
+                        help='Pick the USB latency timer and transfer sizes to '
+                             'suit the snapshot. Explicit values take priority.')
+    parser.add_argument('--regs', dest='regs',
+                        type=arg_check_regs, default=None,
+                        help='Only log these registers: names (e.g. RepSOC) or '
+                             'hex addresses (e.g. 0x006), separated by commas. '
+                             'Logs all registers if not given.')
+    parser.add_argument('--regs-file', dest='regs_file',
+                        type=arg_check_regs_file, default=None,
+                        help='Only log the registers listed in this file, as '
+                             'per --regs. One or more per line, # for comments.')
+    parser.add_argument('-s', '--slow-time', dest='slow_time',
+                        type=float, default=SLOW_TIME,
+                        help='Poll period of the NV registers, in seconds, e.g. '
+                             '60. Their last values are repeated in between, '
+                             'and the pack identity (SBS blocks) is only read '
+                             'once. 0 reads everything every interval.')
+    parser.add_argument('--slow-regs', dest='slow_regs',
+                        type=arg_check_regs, default=None,
+                        help='Also poll these registers at the slow period, as '
+                             'per --regs.')
+    parser.add_argument('--nv-checksum', dest='nv_checksum', action='store_true',
+                        help='Read nCheckSum every interval, and re-read the NV '
+                             'registers as soon as it changes. They are still '
+                             're-read every --slow-time seconds regardless.')
+    parser.add_argument('--derive-sbs', dest='derive_sbs', action='store_true',
+                        help='Work out the SBS registers which mirror logged M5 '
+                             'registers (sCurrent, sAvCap...) from them, rather '
+                             'than reading them.')
+    parser.add_argument('--verify-sbs', dest='verify_time',
+                        type=float, default=None,
+                        help='With --derive-sbs, read the derived SBS registers '
+                             'for real this often, in seconds, and report any '
+                             'that don\'t match.')
     parser.add_argument('-x', dest='exit_on_error', action='store_true',
                         help='Exit the application on a bus error.')
+    parser.add_argument('-r', '--recover', dest='recover_after',
+                        type=int, default=RECOVER_AFTER,
+                        help='Attempt bus recovery after this many failed '
+                             'snapshots in a row. 0 disables recovery.')
     parser.add_argument('-t', '--time', dest='interval',
                         type=float, default=5.0,
-                        help='Collection interval, in seconds.')
+                        help='Collection interval, in seconds. 0 logs as fast '
+                             'as possible.')
+    parser.add_argument('--overrun', dest='overrun',
+                        choices=SCHED_POLICIES, default=SCHED_SKIP,
+                        help='When a snapshot runs past the next one\'s start, '
+                             'skip the missed snapshots or catch up by taking '
+                             'them back to back.')
+    parser.add_argument('--queue-size', dest='queue_size',
+                        type=int, default=WRITER_QUEUE_SIZE,
+                        help='Number of rows which can be waiting to be written '
+                             'to the output file.')
+    parser.add_argument('--backpressure', dest='backpressure',
+                        choices=BACKPRESSURE_POLICIES, default=BACKPRESSURE_BLOCK,
+                        help='When the output file can\'t keep up and the queue '
+                             'is full, wait for room (holding up the snapshots), '
+                             'or drop the oldest or newest row.')
     args = parser.parse_args()
 
+    #Registers can come from both the command line and a file
+    regs = None
+    if (args.regs is not None) or (args.regs_file is not None):
+        regs = (args.regs or []) + (args.regs_file or [])
+
     try:
         bus = args.iface(args.bus_num)
     except:
         print('Failed to open I2C device!')
         quit()
 
+    #Set up the clock rate if requested
+    try:
+        if args.clock == 'auto':
+            print('Probing I2C clock rate...')
+            print('Using I2C clock of {:.1f} kHz'.format(probe_bus_clock(bus) / 1000))
+        elif args.clock is not None:
+            print('Using I2C clock of {:.1f} kHz'.format(bus.set_clock(args.clock) / 1000))
+    except NotImplementedError:
+        print('Clock rate selection is not supported by this interface')
+    except:
+        print('Failed to communicate with device. Check configuration')
+        quit()
+
     # Do a simple poke of a register to make sure comms are alive before starting
     try:
         bus.i2c_read_words(max1730x_regs.M5_DEV_ADDR, 0, 1)
@@ -194,6 +675,43 @@ if __name__ == '__main__':
         print('Failed to communicate with device. Check configuration')
         quit()
 
-    #Per recommendation of CSV documentation, open file with newline = ''
-    with open(args.out_file, 'w', newline='', encoding='utf-8') as output_file:
-        start_logging(output_file, bus, args.exit_on_error, args.interval)
+    #Set up the USB parameters if requested, and show what is being used
+    try:
+        if args.usb_auto:
+            bus.auto_usb_params(get_tiered_plan(False, bus, regs, args.slow_time,
+                                                args.slow_regs, args.nv_checksum,
+                                                args.derive_sbs, args.verify_time).requests())
+        print('USB latency timer: {:d} ms, transfer size in/out: {:d}/{:d} bytes'.format(
+              *bus.set_usb_params(args.latency, args.usb_in, args.usb_out)))
+    except NotImplementedError:
+        if args.usb_auto or any(v is not None for v in (args.latency, args.usb_in, args.usb_out)):
+            print('USB settings are not supported by this interface')
+    print('Measured transaction latency: {:.2f} ms'.format(measure_transaction_latency(bus) * 1000))
+
+    #Work out the output format and compression. The default file name
+    #follows the format, and gets the compression's extension added
+    log_format = args.log_format
+    out_file = args.out_file
+    compress = args.compress
+    if compress is None:
+        compress = compress_method(out_file)
+    elif compress_method(out_file) != compress:
+        out_file += '.' + compress
+    base_name = out_file[:-len(compress) - 1] if compress else out_file
+    if log_format is None:
+        log_format = LOG_FORMAT_BIN if base_name.lower().endswith('.bin') else LOG_FORMAT_CSV
+    elif (log_format == LOG_FORMAT_BIN) and (args.out_file == def_out_file):
+        out_file = out_file.replace('.csv', '.bin', 1)
+
+    #Per recommendation of CSV documentation, the file is opened with
+    #newline = ''
+    output_file = open_output(out_file, log_format == LOG_FORMAT_BIN, compress,
+                              args.compress_block * 1024)
+    with output_file:
+        start_logging(output_file, bus, args.exit_on_error, args.interval,
+                      recover_after=args.recover_after, regs=regs,
+                      slow_time=args.slow_time, slow_regs=args.slow_regs,
+                      nv_checksum=args.nv_checksum, derive_sbs=args.derive_sbs,
+                      verify_time=args.verify_time, overrun=args.overrun,
+                      queue_size=args.queue_size, backpressure=args.backpressure,
+                      log_format=log_format)
@@ -0,0 +1,507 @@
+#
+# Compiles the registers selected for logging into the list of bus reads
+# making up a snapshot, and decodes the results of those reads back into the
+# logged values.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+import max1730x_regs
+from collections import namedtuple
+from operator import itemgetter
+from struct import Struct
+from i2c_iface import I_I2C, I2C_ReadRequest, I2CNackError
+
+#A single 16-bit register to be logged from one of the register pages.
+#dev_addr is the 8-bit I2C bus address, addr the full register address
+#(0x000-0x1FF) and name the column name it is logged under
+PlanRegister = namedtuple('PlanRegister', ['dev_addr', 'addr', 'name'])
+
+#A read of consecutive page registers, first_addr through last_addr
+PlanRun = namedtuple('PlanRun', ['dev_addr', 'first_addr', 'last_addr'])
+
+
+def register_db(pages: list = max1730x_regs.REGISTER_PAGES,
+                sbs_registers: list = max1730x_regs.SBS_REGISTERS):
+    '''
+    Gets the register_database for a register map, which is the prebuilt
+    REGISTER_DB for the default one
+
+    :param pages: List of RegisterPage
+    :param sbs_registers: List of SBS_Register
+    :return: max1730x_regs.register_database
+    '''
+    if (pages is max1730x_regs.REGISTER_PAGES) and (sbs_registers is max1730x_regs.SBS_REGISTERS):
+        return max1730x_regs.REGISTER_DB
+    return max1730x_regs.register_database(pages, sbs_registers)
+
+
+def page_registers(keep_rsvd: bool = False, pages: list = max1730x_regs.REGISTER_PAGES):
+    '''
+    Lists the registers of the register pages, in page order. The column names
+    are the register name followed by the address, e.g. 'RepCap_005'.
+
+    :param keep_rsvd: Flag to include Reserved registers, named 'RSVD_xxx'
+    :param pages: List of RegisterPage
+    :return: List of PlanRegister
+    '''
+    db = register_db(pages)
+    return [PlanRegister(r.dev_addr, r.addr, r.column) for r in db.registers
+            if keep_rsvd or not db.is_reserved(r.addr)]
+
+
+def select_registers(selection: list = None, keep_rsvd: bool = False,
+                     pages: list = max1730x_regs.REGISTER_PAGES,
+                     sbs_registers: list = max1730x_regs.SBS_REGISTERS):
+    '''
+    Resolves a selection of registers against the register map. Each entry can
+    be a register name ('RepSOC', 'sCurrent'), a column name ('RepSOC_006'),
+    or an address, either as an int or a hex string ('0x006'). Names are not
+    case sensitive. Where a name is used by more than one register (Status),
+    the name alone selects the first and the column name the others. Selecting
+    a Reserved register by address logs it as 'RSVD_xxx'. The registers are
+    returned in register map order, whatever order they were selected in.
+
+    :param selection: List of register names or addresses. None selects all
+                      of the registers
+    :param keep_rsvd: Flag to include Reserved registers when selecting all
+    :param pages: List of RegisterPage
+    :param sbs_registers: List of SBS_Register
+    :return: Tuple of the list of PlanRegister and the list of SBS_Register
+    :raises: ValueError for a name or address not in the register map
+    '''
+    if selection is None:
+        return page_registers(keep_rsvd, pages), list(sbs_registers)
+
+    db = register_db(pages, sbs_registers)
+    selected = sorted(set(db.lookup(entry) for entry in selection), key = db.order.get)
+    return ([PlanRegister(r.dev_addr, r.addr, r.column) for r in selected
+             if isinstance(r, max1730x_regs.PageRegister)],
+            [r for r in selected if isinstance(r, max1730x_regs.SBS_Register)])
+
+
+class read_plan:
+    '''
+    The reads making up a snapshot of a set of registers, and the layout needed
+    to turn the results back into the logged values.
+
+    The page registers are sorted by address and gathered into runs, one read
+    each. Reserved or unselected registers between two selected ones are read
+    over (and discarded) when that's cheaper than starting another
+    transaction, going by the interface's cost model: TXN_OVERHEAD_BYTES, the
+    cost of a transaction in terms of bytes read, and MAX_READ_BYTES, the
+    longest single read. So whole pages are joined, unused registers at the
+    start and end of a page are never read, and pages with large reserved gaps
+    are split in two. SBS registers are always read on their own.
+
+    SBS block reads start with the SMBus length byte. Only that many bytes
+    after it are kept, and block_sizes can be used to only read that many.
+
+    The columns are kept in the order given, whatever order the reads are made
+    in, and the header and decoded values both come from the same plan.
+    '''
+    def __init__(self, registers: list, sbs_registers: list = max1730x_regs.SBS_REGISTERS,
+                 max_read_bytes: int = I_I2C.MAX_READ_BYTES,
+                 txn_overhead_bytes: int = I_I2C.TXN_OVERHEAD_BYTES,
+                 db: max1730x_regs.register_database = None,
+                 block_sizes: dict = None):
+        '''
+        :param registers: List of PlanRegister to log, in column order
+        :param sbs_registers: List of SBS_Register to log, after the registers
+        :param max_read_bytes: Longest read the interface can make, in bytes
+        :param txn_overhead_bytes: Cost of an extra transaction, in bytes
+        :param db: register_database the registers are from, which gives the
+                   column names and the registers which can be read over.
+                   Defaults to REGISTER_DB
+        :param block_sizes: Dictionary of SBS block register address to the
+                            number of bytes to read, length byte included,
+                            where it differs from the block_size
+        '''
+        if db is None:
+            db = register_db()
+        if block_sizes is None:
+            block_sizes = {}
+        self.registers = list(registers)
+        self.sbs_registers = list(sbs_registers)
+        self.columns = [db.column_name(r.addr) for r in self.registers] + \
+                       [db.column_name(sbs.base_addr) for sbs in self.sbs_registers]
+
+        #A gap can be read over if it is no more expensive than a new
+        #transaction. Registers are 2 bytes each
+        max_gap = txn_overhead_bytes // 2
+        max_words = max(1, max_read_bytes // 2)
+        self.runs = []
+        for addr, dev_addr in sorted(set((r.addr, r.dev_addr) for r in self.registers)):
+            if self.runs:
+                last = self.runs[-1]
+                gap = range(last.last_addr + 1, addr)
+                if (last.dev_addr == dev_addr) and \
+                   ((addr >> 8) == (last.first_addr >> 8)) and \
+                   (len(gap) <= max_gap) and \
+                   all(db.is_readable(a) for a in gap) and \
+                   (addr - last.first_addr < max_words):
+                    self.runs[-1] = last._replace(last_addr = addr)
+                    continue
+            self.runs.append(PlanRun(dev_addr, addr, addr))
+
+        self.requests = [I2C_ReadRequest(run.dev_addr, run.first_addr & 0xFF,
+                                         2 * (run.last_addr - run.first_addr + 1))
+                         for run in self.runs]
+        self.requests += [I2C_ReadRequest(sbs.dev_addr, sbs.base_addr & 0xFF,
+                                          block_sizes.get(sbs.base_addr, sbs.block_size)
+                                          if sbs.block_size > 0 else 2)
+                          for sbs in self.sbs_registers]
+
+        #Row assembly. The words of all the runs are unpacked into one list,
+        #then picked out in column order
+        #< for little endian, H for unsigned short
+        self.__run_words = [Struct('<{:d}H'.format(run.last_addr - run.first_addr + 1))
+                            for run in self.runs]
+        word_index = {}
+        ofs = 0
+        for run in self.runs:
+            for addr in range(run.first_addr, run.last_addr + 1):
+                word_index[(run.dev_addr, addr)] = ofs
+                ofs += 1
+        self.word_index = [word_index[(r.dev_addr, r.addr)] for r in self.registers]
+        if len(self.word_index) > 1:
+            self.__pick_words = itemgetter(*self.word_index)
+        else:
+            self.__pick_words = lambda w: tuple(w[i] for i in self.word_index)
+        self.__num_runs = len(self.runs)
+        self.__sbs_unpack = [None if sbs.block_size > 0 else Struct('<H').unpack
+                             for sbs in self.sbs_registers]
+
+    def decode(self, results: list):
+        '''
+        Decodes the results of the plan's reads into the logged values
+
+        :param results: Results of reading the plan's requests, e.g. from
+                        I_I2C.i2c_read_batch()
+        :return: List of values in column order. Registers and SBS words are
+                 ints, SBS blocks are bytes
+        '''
+        words = []
+        for run_words, rd in zip(self.__run_words, results):
+            words.extend(run_words.unpack(rd))
+        values = list(self.__pick_words(words))
+        for sbs_unpack, rd in zip(self.__sbs_unpack, results[self.__num_runs:]):
+            if sbs_unpack is None:
+                #Keep the length byte and as many bytes after it as it says
+                rd = bytes(rd)
+                values.append(rd[:1 + rd[0]] if rd else rd)
+            else:
+                values.append(sbs_unpack(rd)[0])
+        return values
+
+
+#Polling tiers. Fast registers are read every interval, slow ones every slow
+#period, and once registers only at the start of the session
+TIER_FAST = 'fast'
+TIER_SLOW = 'slow'
+TIER_ONCE = 'once'
+TIERS = [TIER_FAST, TIER_SLOW, TIER_ONCE]
+
+#Pseudo tier reading derived registers for real, to check the derivations
+TIER_VERIFY = 'verify'
+
+#Value given to SBS registers the device doesn't support
+UNSUPPORTED = 'NA'
+
+#Largest difference, in LSBs, between a derived value and the register read for
+#real before it's reported as a mismatch
+VERIFY_TOLERANCE = 1
+
+
+def default_tier(reg):
+    '''
+    Gets the polling tier for a register. The NV registers (0x180-0x1FF) only
+    change when the device is configured, so are polled slowly. The SBS block
+    registers hold the pack's identity strings, so are only read once.
+    Everything else is polled every interval.
+
+    :param reg: PlanRegister or SBS_Register
+    :return: Tier, one of TIERS
+    '''
+    if isinstance(reg, max1730x_regs.SBS_Register):
+        return TIER_ONCE if reg.block_size > 0 else TIER_FAST
+    return TIER_SLOW if reg.dev_addr == max1730x_regs.SBS_NV_DEV_ADDR else TIER_FAST
+
+
+class poll_tier:
+    '''
+    A group of registers polled together, with its read_plan and the columns
+    the values land in.
+    '''
+    def __init__(self, name: str, members: list, period: float):
+        '''
+        :param name: Tier name, one of TIERS
+        :param members: List of (column index, register) for the tier's
+                        registers, either PlanRegister or SBS_Register
+        :param period: Poll period in seconds, 0 for every poll or None for
+                       only the first
+        '''
+        self.name = name
+        self.members = members
+        self.period = period
+        self.next_time = 0.0
+        self.plan = None
+        self.columns = []
+
+
+class tiered_plan:
+    '''
+    Splits the registers being logged into polling tiers (see default_tier()),
+    with a read_plan for each. Each poll only reads the tiers which are due,
+    and the values of the others are carried forward from their last read, so
+    every row still has all of the columns.
+
+    A tier can also be given watch registers, which are read on every poll. A
+    change in any of them makes the tier due on the next poll, whatever its
+    period, e.g. nCheckSum for the NV registers.
+
+    SBS registers which mirror other logged registers can be derived instead
+    of read (see max1730x_sbs). Their values are worked out after each poll.
+    With a verify period, they are also read for real that often, and any
+    that differ from the derived values are listed in mismatches.
+
+    Not every part implements every SBS register. One whose register address
+    is NACK'd is added to unsupported and left out of the reads from then on,
+    with UNSUPPORTED as its value. Where the interface can't tell which byte
+    was NACK'd, the register has to fail on two polls in a row first, so a
+    one-off bus glitch isn't taken for it. A NACK of the device address is
+    just an error. SBS blocks are only read up to the length the device gives.
+    '''
+    def __init__(self, registers: list, sbs_registers: list = max1730x_regs.SBS_REGISTERS,
+                 periods: dict = None, tier_of = default_tier,
+                 max_read_bytes: int = I_I2C.MAX_READ_BYTES,
+                 txn_overhead_bytes: int = I_I2C.TXN_OVERHEAD_BYTES,
+                 watch: dict = None, derived: dict = None,
+                 verify_period: float = None):
+        '''
+        :param registers: List of PlanRegister to log, in column order
+        :param sbs_registers: List of SBS_Register to log, after the registers
+        :param periods: Dictionary of tier to poll period in seconds. None (or
+                        a missing tier) reads it once, 0 reads it every poll.
+                        Defaults to reading everything every poll
+        :param tier_of: Function giving the tier of a register
+        :param max_read_bytes: Longest read the interface can make, in bytes
+        :param txn_overhead_bytes: Cost of an extra transaction, in bytes
+        :param watch: Dictionary of tier to a list of PlanRegister to watch
+                      for changes. Tiers not being logged are ignored
+        :param derived: Dictionary of SBS_Register to a tuple of the list of
+                        registers it's derived from, and the function taking
+                        their values and returning its value. The sources
+                        need to be among the logged registers
+        :param verify_period: How often to read the derived registers for
+                              real, in seconds. None never does
+        '''
+        if periods is None:
+            periods = {t : 0 for t in TIERS}
+        self.__max_read_bytes = max_read_bytes
+        self.__txn_overhead_bytes = txn_overhead_bytes
+        self.registers = list(registers)
+        self.sbs_registers = list(sbs_registers)
+        self.columns = read_plan(self.registers, self.sbs_registers, max_read_bytes,
+                                 txn_overhead_bytes).columns
+        self.values = [None] * len(self.columns)
+        self.mismatches = []
+        self.unsupported = set()
+        self.__suspects = set()
+        self.__block_sizes = {}
+
+        derived = derived or {}
+        column_of = {r : idx for idx, r in enumerate(self.registers + self.sbs_registers)}
+        self.__derived = [(column_of[sbs], [column_of[src] for src in sources], fn)
+                          for sbs, (sources, fn) in derived.items() if sbs in column_of]
+
+        self.tiers = []
+        for tier in TIERS:
+            members = [(column_of[r], r) for r in self.registers + self.sbs_registers
+                       if (tier_of(r) == tier) and (r not in derived)]
+            if members:
+                self.tiers.append(poll_tier(tier, members, periods.get(tier)))
+        if self.__derived and (verify_period is not None):
+            members = [(column_of[r], r) for r in self.sbs_registers if r in derived]
+            self.tiers.append(poll_tier(TIER_VERIFY, members, verify_period))
+        for tier in self.tiers:
+            self.__build(tier)
+
+        #The watch registers of every tier are read as one more plan. Their
+        #values are only used to spot changes, not logged
+        self.__watch_tiers = []
+        watch_regs = []
+        for tier in self.tiers:
+            for r in (watch or {}).get(tier.name, []):
+                self.__watch_tiers.append(tier)
+                watch_regs.append(r)
+        self.__watch = read_plan(watch_regs, [], max_read_bytes, txn_overhead_bytes)
+        self.__watch_values = None
+        self.__batches = {}
+
+    def __build(self, tier: poll_tier):
+        '''
+        Builds (or rebuilds) the read_plan of a tier, leaving out unsupported
+        registers
+        :param tier: poll_tier to build the plan for
+        '''
+        members = [(idx, r) for idx, r in tier.members if r not in self.unsupported]
+        regs = [(idx, r) for idx, r in members if isinstance(r, PlanRegister)]
+        sbs = [(idx, r) for idx, r in members if not isinstance(r, PlanRegister)]
+        tier.plan = read_plan([r for _, r in regs], [r for _, r in sbs],
+                              self.__max_read_bytes, self.__txn_overhead_bytes,
+                              block_sizes = self.__block_sizes)
+        tier.columns = [idx for idx, _ in regs + sbs]
+        self.__batches = {}
+
+    def __batch(self, due):
+        '''
+        Gets the combined requests for a set of due tiers, building them on
+        first use. The watch registers are always read last
+        :param due: Tuple of the indices of the due tiers
+        :return: Tuple of the requests, and the slice of the results for each
+                 due tier
+        '''
+        batch = self.__batches.get(due)
+        if batch is None:
+            requests = []
+            slices = []
+            for t in due:
+                tier_reqs = self.tiers[t].plan.requests
+                slices.append(slice(len(requests), len(requests) + len(tier_reqs)))
+                requests.extend(tier_reqs)
+            requests.extend(self.__watch.requests)
+            batch = (requests, slices)
+            self.__batches[due] = batch
+        return batch
+
+    def __drop_nacked(self, nack: I2CNackError, due: tuple):
+        '''
+        Marks the SBS register a NACK came from as unsupported, and rebuilds
+        the plans without it. A NACK the interface can't place only marks the
+        register as a suspect the first time
+        :param nack: I2CNackError from reading the due tiers
+        :param due: Tuple of the indices of the due tiers
+        :return: True if the NACK was from a SBS register, now dropped, False
+                 if not
+        '''
+        #Only a NACK of the register address means the device doesn't have
+        #the register. A NACK of the device address is it not answering at all
+        if nack.byte_index not in (1, None):
+            return False
+        for t in due:
+            tier = self.tiers[t]
+            for idx, r in tier.members:
+                if isinstance(r, PlanRegister) or (r in self.unsupported):
+                    continue
+                if ((r.dev_addr & 0xFE) == (nack.bus_addr & 0xFE)) and \
+                   ((r.base_addr & 0xFF) == nack.reg_addr):
+                    if (nack.byte_index is None) and (r not in self.__suspects):
+                        self.__suspects.add(r)
+                        return False
+                    self.__suspects.discard(r)
+                    self.unsupported.add(r)
+                    if tier.name != TIER_VERIFY:
+                        self.values[idx] = UNSUPPORTED
+                    for tier in self.tiers:
+                        self.__build(tier)
+                    return True
+        return False
+
+    def __check_block_sizes(self, tier: poll_tier, values: list):
+        '''
+        Updates the number of bytes to read for each of the tier's SBS blocks,
+        from the length byte just read. If a block was cut short, the whole
+        block is read again next time
+        :param tier: poll_tier just read
+        :param values: Values decoded from the tier
+        '''
+        changed = False
+        for r, value in zip(tier.plan.sbs_registers, values[len(tier.plan.registers):]):
+            if (r.block_size <= 0) or not value:
+                continue
+            size = self.__block_sizes.get(r.base_addr, r.block_size)
+            want = min(1 + value[0], r.block_size)
+            if (want < size) or ((value[0] + 1 > len(value)) and (size < r.block_size)):
+                self.__block_sizes[r.base_addr] = want if want < size else r.block_size
+                changed = True
+        if changed:
+            for tier in self.tiers:
+                self.__build(tier)
+
+    def requests(self):
+        '''
+        Gets all of the plan's reads, as made by a poll with every tier due
+        :return: List of I2C_ReadRequest
+        '''
+        return self.__batch(tuple(range(len(self.tiers))))[0]
+
+    def poll(self, bus_dev: I_I2C, now: float):
+        '''
+        Reads the tiers which are due, and updates the values with the results.
+        A tier which fails to read is tried again on the next poll.
+
+        :param bus_dev: I2C Bus instance
+        :param now: Current time in seconds, for working out which are due
+        :return: List of values in column order, as per read_plan.decode().
+                 Values not yet read are None, and unsupported SBS registers
+                 UNSUPPORTED
+        '''
+        due = tuple(t for t, tier in enumerate(self.tiers)
+                    if (tier.next_time is not None) and (now >= tier.next_time))
+        requests, slices = self.__batch(due)
+        if not requests:
+            return self.values
+        try:
+            results = bus_dev.i2c_read_batch(requests)
+        except I2CNackError as ex:
+            #Try again without the register, if it was an SBS one
+            if not self.__drop_nacked(ex, due):
+                raise
+            return self.poll(bus_dev, now)
+        if self.__suspects:
+            for t in due:
+                self.__suspects.difference_update(r for _, r in self.tiers[t].members)
+
+        verify = []
+        for t, rslice in zip(due, slices):
+            tier = self.tiers[t]
+            tier_values = tier.plan.decode(results[rslice])
+            if tier.name == TIER_VERIFY:
+                verify = list(zip(tier.columns, tier_values))
+            else:
+                for idx, value in zip(tier.columns, tier_values):
+                    self.values[idx] = value
+            tier.next_time = None if tier.period is None else now + tier.period
+            self.__check_block_sizes(tier, tier_values)
+
+        #Work out the derived registers from the values just read, then check
+        #them against any read for real
+        for idx, sources, fn in self.__derived:
+            src_values = [self.values[src] for src in sources]
+            self.values[idx] = None if None in src_values else fn(*src_values)
+        self.mismatches = []
+        for idx, value in verify:
+            derived_value = self.values[idx]
+            if derived_value is not None:
+                diff = (derived_value - value) & 0xFFFF
+                if min(diff, 0x10000 - diff) <= VERIFY_TOLERANCE:
+                    continue
+            self.mismatches.append((self.columns[idx], derived_value, value))
+
+        #A tier read in this same poll is already up to date with its watch
+        #registers. Otherwise a change means it needs reading again
+        if self.__watch_tiers:
+            watch_values = self.__watch.decode(results[len(requests) - len(self.__watch.requests):])
+            if self.__watch_values is not None:
+                for tier, old, new in zip(self.__watch_tiers, self.__watch_values, watch_values):
+                    if (old != new) and (self.tiers.index(tier) not in due):
+                        tier.next_time = now
+            self.__watch_values = watch_values
+        return self.values
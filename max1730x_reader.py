@@ -0,0 +1,199 @@
+#
+# Reads logs back for analysis as NumPy arrays. Binary logs are memory mapped,
+# so opening one takes the same time whatever its length, and CSV or
+# compressed logs are converted to a binary cache alongside them first.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+import max1730x_regs
+from max1730x_plan import PlanRegister
+from max1730x_binlog import binary_log_writer, read_header, BINLOG_MAGIC
+from max1730x_compress import open_compressed, compress_method
+from bisect import bisect_left
+import csv
+import math
+import os
+import shutil
+
+#Extension added to a CSV or compressed log's name for its binary cache
+LOG_CACHE_EXT = '.cache.bin'
+
+#Field names of the timestamp and validity bitmap in the record dtype
+TIMESTAMP_FIELD = 'Timestamp'
+VALID_FIELD = '_valid'
+
+
+def seconds_to_ns(seconds: float):
+    '''
+    Converts a time in seconds since the Epoch to ns. A float holds the time
+    of day to a fraction of a µs, so multiplying it out by 1e9 can land a few
+    hundred ns either side of a time written in decimal (1700000000.75). The
+    fraction is rounded to the µs instead, so those come out exact
+
+    :param seconds: Time in seconds since the Epoch
+    :return: Time in ns since the Epoch, as an int
+    '''
+    whole = math.floor(seconds)
+    return whole * 1000000000 + round((seconds - whole) * 1e6) * 1000
+
+
+def csv_to_binary(csv_path: str, bin_path: str):
+    '''
+    Converts a CSV log to the binary format. The columns are looked up in the
+    register map by name, so the CSV must come from the same map
+
+    :param csv_path: Name of the CSV log, which may be compressed
+    :param bin_path: Name of the binary log to write
+    :raises: ValueError if a column isn't in the register map
+    '''
+    with open_compressed(csv_path, 'rt') as csv_file, \
+         open(bin_path, 'wb') as bin_file:
+        rows = csv.reader(csv_file)
+        columns = next(rows)[1:]
+        registers = []
+        sbs_registers = []
+        for name in columns:
+            reg = max1730x_regs.REGISTER_DB.lookup(name)
+            if isinstance(reg, max1730x_regs.SBS_Register):
+                sbs_registers.append(reg)
+            else:
+                registers.append(PlanRegister(reg.dev_addr, reg.addr, reg.column))
+
+        #Blocks were logged as hex strings, everything else as 16-bit hex.
+        #Empty fields and NA have no value
+        blocks = [False] * len(registers) + [sbs.block_size > 0 for sbs in sbs_registers]
+        def parse(field, block):
+            if (field == '') or (field == 'NA'):
+                return None
+            return bytes.fromhex(field) if block else int(field, 16)
+
+        writer = binary_log_writer(bin_file, registers, sbs_registers,
+                                   {'converted_from' : os.path.basename(csv_path)})
+        writer.write_header()
+        for row in rows:
+            if len(row) != len(columns) + 1:
+                continue
+            writer.write_row(seconds_to_ns(float(row[0])),
+                             [parse(f, b) for f, b in zip(row[1:], blocks)])
+
+
+class log_reader:
+    '''
+    Memory mapped view of a binary log, as a NumPy structured array with a
+    field per column, named as in the CSV header ('RepCap_005'), plus the
+    Timestamp in ns. Nothing is read from the file until it's used, and the
+    column and slice views don't copy anything.
+
+    A record only partly written (the logger is still running) is left out.
+    '''
+    def __init__(self, path: str):
+        '''
+        :param path: Name of a binary log, or of a CSV log. A CSV log is
+                     converted to a binary cache the first time, and again
+                     whenever the CSV is newer than the cache. Compressed
+                     logs (see max1730x_compress) are cached the same way
+        '''
+        #Import numpy here, as it's only needed to read logs back, not to
+        #log. Should only get touched if the class is initialized
+        global _np
+        import numpy as _np
+
+        with open_compressed(path, 'rb') as f:
+            is_binary = f.read(len(BINLOG_MAGIC)) == BINLOG_MAGIC
+        if (not is_binary) or compress_method(path):
+            cache_path = path + LOG_CACHE_EXT
+            if (not os.path.exists(cache_path)) or \
+               (os.path.getmtime(cache_path) < os.path.getmtime(path)):
+                if is_binary:
+                    with open_compressed(path, 'rb') as f, open(cache_path, 'wb') as cache:
+                        shutil.copyfileobj(f, cache)
+                else:
+                    csv_to_binary(path, cache_path)
+            path = cache_path
+        self.path = path
+
+        with open(path, 'rb') as f:
+            self.header, offset = read_header(f)
+        self.columns = [c['name'] for c in self.header['columns']]
+        self.__column_index = {name : idx for idx, name in enumerate(self.columns)}
+
+        #Same layout as the record struct: timestamp, the words, the blocks,
+        #then the validity bitmap
+        cols = self.header['columns']
+        fields = [(TIMESTAMP_FIELD, '<i8')]
+        fields += [(c['name'], '<u2') for c in cols if c['type'] == 'word']
+        fields += [(c['name'], 'S{:d}'.format(c['size'])) for c in cols if c['type'] == 'block']
+        fields += [(VALID_FIELD, 'u1', ((len(cols) + 7) // 8,))]
+        self.dtype = _np.dtype(fields)
+        if self.dtype.itemsize != self.header['record_size']:
+            raise ValueError('Record layout of {} is not as expected'.format(path))
+
+        num_records = (os.path.getsize(path) - offset) // self.dtype.itemsize
+        if num_records > 0:
+            self.records = _np.memmap(path, dtype = self.dtype, mode = 'r',
+                                      offset = offset, shape = (num_records,))
+        else:
+            self.records = _np.zeros(0, dtype = self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, key):
+        '''
+        Gets records by index or slice, or a column by name
+        '''
+        return self.records[key]
+
+    def column(self, name: str):
+        '''
+        Gets a column's values for every record, without copying
+
+        :param name: Column name, as in the CSV header
+        :return: NumPy array view
+        '''
+        return self.records[name]
+
+    def timestamps(self):
+        '''
+        Gets the record timestamps, in ns since the Epoch
+        '''
+        return self.records[TIMESTAMP_FIELD]
+
+    def valid(self, name: str, records = None):
+        '''
+        Gets which records have a value for a column. Values are missing
+        before a register is first read, or if the device doesn't support it
+
+        :param name: Column name, as in the CSV header
+        :param records: Records to check, e.g. from time_slice(). Defaults to
+                        all of them
+        :return: NumPy array of bool
+        '''
+        if records is None:
+            records = self.records
+        idx = self.__column_index[name]
+        return (records[VALID_FIELD][:, idx >> 3] >> (idx & 7)) & 1 == 1
+
+    def time_slice(self, start: float = None, end: float = None):
+        '''
+        Gets the records logged from start up to (not including) end. The
+        records are in time order, so this is a binary search rather than a
+        scan, and the result is a view
+
+        :param start: Start time in seconds since the Epoch. None for the first
+        :param end: End time in seconds since the Epoch. None for the last
+        :return: NumPy structured array view
+        '''
+        #numpy's searchsorted would copy the strided timestamp view first,
+        #reading the whole file. bisect only touches the records it checks
+        stamps = self.timestamps()
+        first = 0 if start is None else bisect_left(stamps, seconds_to_ns(start))
+        last = len(stamps) if end is None else bisect_left(stamps, seconds_to_ns(end))
+        return self.records[first:last]
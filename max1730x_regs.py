@@ -11,6 +11,8 @@
 # Author: Brent Kowal <brent.kowal@analog.com>
 #
 from collections import namedtuple
+import hashlib
+import json
 
 #Address for the core m5 registers (Regs 0x000-0x0FF)
 M5_DEV_ADDR     = 0x6C
@@ -22,12 +24,19 @@ SBS_NV_DEV_ADDR = 0x16
 #The reg_names is just a list of plain-text strings to describe the registers.
 #If a reg name is None, that register is designated as Reserved by the device.
 RegisterPage = namedtuple('RegisterPage', ['dev_addr', 'base_addr', 'reg_names'])
+PAGE_REGS = 16
 
 #Represents a SBS register which could be a single word, or a block read for
 #longer data. If block_size <= 0, it is assumed to be a single word. Otherwise,
 #block_size is the number of expected bytes in a block read
 SBS_Register = namedtuple('SBS_Register', ['dev_addr', 'base_addr', 'block_size', 'reg_name'])
 
+#A single 16-bit register of one of the register pages, as indexed by
+#register_database. addr is the full register address (0x000-0x1FF), reg_name is
+#None for a Reserved register, and column is the name it's logged under, e.g.
+#'RepCap_005' or 'RSVD_024'
+PageRegister = namedtuple('PageRegister', ['dev_addr', 'addr', 'reg_name', 'column'])
+
 #Registers 0x000-0x00F
 M5_DATABLOCK_000 = RegisterPage(M5_DEV_ADDR, 0x000,
    ['Status',     'VAlrtTh',    'TAlrtTh',    'SAlrtTh',
@@ -193,3 +202,134 @@ REGISTER_PAGES = [
     M5_DATABLOCK_040, M5_DATABLOCK_0A0, M5_DATABLOCK_0B0, M5_DATABLOCK_0D0,
     M5_DATABLOCK_0F0, M5_NVBLOCK_180,   M5_NVBLOCK_190,   CFG_NVBLOCK_1A0,
     CFG_NVBLOCK_1B0,  CFG_NVBLOCK_1C0,  PROT_NVBLOCK_1D0, USER_NVBLOCK_1E0 ]
+
+
+def sbs_column(sbs: SBS_Register):
+    '''
+    Gets the name a SBS register is logged under, e.g. 'sCurrent_10A'
+    '''
+    return '{}_{:03X}'.format(sbs.reg_name, sbs.base_addr)
+
+
+class register_database:
+    '''
+    Index of the register map, built once so registers can be looked up by
+    name or address without scanning the pages.
+
+    Register names aren't unique (Status is both 0x000 and 0x0D7). A name on
+    its own finds the first in map order, and the column name ('Status_0D7')
+    any of them.
+    '''
+    def __init__(self, pages: list = REGISTER_PAGES, sbs_registers: list = SBS_REGISTERS):
+        '''
+        :param pages: List of RegisterPage
+        :param sbs_registers: List of SBS_Register
+        '''
+        self.pages = list(pages)
+        self.sbs_registers = list(sbs_registers)
+
+        #Every page register, Reserved ones included, in map order. Bit n of a
+        #page's reserved mask is set if register base_addr + n is Reserved
+        self.registers = []
+        self.reserved_masks = {}
+        for page in self.pages:
+            mask = 0
+            for idx, name in enumerate(page.reg_names):
+                addr = page.base_addr + idx
+                if name is None:
+                    mask |= 1 << idx
+                    column = 'RSVD_{:03X}'.format(addr)
+                else:
+                    column = name + '_{:03X}'.format(addr)
+                self.registers.append(PageRegister(page.dev_addr, addr, name, column))
+            self.reserved_masks[page.base_addr] = mask
+
+        #Lookups. Names are kept in lower case, as they're matched without
+        #regard to case
+        self.by_addr = {}
+        self.by_name = {}
+        for r in self.registers:
+            self.by_addr[r.addr] = r
+            self.by_name[r.column.lower()] = r
+            if r.reg_name is not None:
+                self.by_name.setdefault(r.reg_name.lower(), r)
+        for sbs in self.sbs_registers:
+            self.by_addr[sbs.base_addr] = sbs
+            self.by_name[sbs_column(sbs).lower()] = sbs
+            self.by_name.setdefault(sbs.reg_name.lower(), sbs)
+
+        #Position of each register in map order, and its index in the logged
+        #columns when logging everything without the Reserved registers
+        self.order = {r : idx for idx, r in enumerate(self.registers + self.sbs_registers)}
+        self.columns = [r.column for r in self.registers if not self.is_reserved(r.addr)] + \
+                       [sbs_column(sbs) for sbs in self.sbs_registers]
+        self.column_index = {}
+        for r in self.registers:
+            if not self.is_reserved(r.addr):
+                self.column_index[r.addr] = len(self.column_index)
+        for sbs in self.sbs_registers:
+            self.column_index[sbs.base_addr] = len(self.column_index)
+
+        #Identifies the register map, so data logged against it can be checked
+        #against the map reading it back. Only changes when the map does
+        schema = {'pages' : [[p.dev_addr, p.base_addr, list(p.reg_names)] for p in self.pages],
+                  'sbs' : [list(sbs) for sbs in self.sbs_registers]}
+        self.schema_hash = hashlib.sha256(json.dumps(schema, sort_keys = True).encode()).hexdigest()[:16]
+
+    def is_readable(self, addr: int):
+        '''
+        Checks if a register can be read, being any register of the register
+        pages, Reserved ones included. Reads can be joined over these
+        '''
+        return (addr - addr % PAGE_REGS) in self.reserved_masks
+
+    def is_reserved(self, addr: int):
+        '''
+        Checks if a page register is Reserved, from its page's reserved mask
+        '''
+        mask = self.reserved_masks.get(addr - addr % PAGE_REGS, 0)
+        return bool((mask >> (addr % PAGE_REGS)) & 1)
+
+    def column_name(self, addr: int):
+        '''
+        Gets the name a register is logged under. Reserved registers, which
+        aren't among the columns, are 'RSVD_xxx'
+
+        :param addr: Full register address
+        :return: Column name
+        :raises: ValueError for an address not in the register map
+        '''
+        idx = self.column_index.get(addr)
+        if idx is not None:
+            return self.columns[idx]
+        if self.is_reserved(addr):
+            return self.by_addr[addr].column
+        raise ValueError('0x{:03X} is not a known register'.format(addr))
+
+    def lookup(self, key):
+        '''
+        Finds a register by name, column name or address. Names are not case
+        sensitive, and addresses can be an int or a hex string ('0x006')
+
+        :param key: Register name or address
+        :return: PageRegister or SBS_Register
+        :raises: ValueError for a name or address not in the register map
+        '''
+        reg = None
+        if isinstance(key, str):
+            name = key.strip().lower()
+            reg = self.by_name.get(name)
+            if (reg is None) and name.startswith('0x'):
+                try:
+                    reg = self.by_addr.get(int(name, 16))
+                except ValueError:
+                    pass
+        elif isinstance(key, int):
+            reg = self.by_addr.get(key)
+        if reg is None:
+            raise ValueError('{} is not a known register'.format(key))
+        return reg
+
+
+#The register map, indexed
+REGISTER_DB = register_database()
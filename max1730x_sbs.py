@@ -0,0 +1,95 @@
+#
+# Conversions from the MAX1730x M5 registers to the SBS registers which mirror
+# them, so the SBS values can be worked out from a snapshot rather than read.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+
+#M5 register units, from the datasheet. Current and capacity are measured as a
+#voltage across the sense resistor, so their scale depends on nRSense
+CURRENT_LSB_UV   = 1.5625   #uV across the sense resistor
+CAPACITY_LSB_UVH = 5.0      #uVh across the sense resistor
+VOLTAGE_LSB_MV   = 0.078125
+TEMP_LSB_C       = 1.0 / 256
+CYCLES_LSB_PCT   = 25
+RSENSE_LSB_UOHM  = 10
+
+#Register addresses of the sources
+NRSENSE_ADDR     = 0x1CF
+
+
+def _signed(word: int):
+    '''
+    Interprets a 16-bit register value as two's complement
+    '''
+    return word - 0x10000 if word & 0x8000 else word
+
+
+def _word(value: float):
+    '''
+    Rounds a SBS value to the nearest unit and packs it back into 16 bits
+    '''
+    return int(round(value)) & 0xFFFF
+
+
+def sbs_current(current: int, rsense: int):
+    '''
+    Current (1.5625uV/RSense) to SBS current (mA, signed)
+    '''
+    if not rsense:
+        return None
+    return _word(_signed(current) * CURRENT_LSB_UV * 1000 / (rsense * RSENSE_LSB_UOHM))
+
+
+def sbs_capacity(capacity: int, rsense: int):
+    '''
+    Capacity (5.0uVh/RSense) to SBS capacity (mAh). Assumes the SBS registers
+    report in mAh, not 10mWh (CAPACITY_MODE clear in sBatteryMode)
+    '''
+    if not rsense:
+        return None
+    return _word(capacity * CAPACITY_LSB_UVH * 1000 / (rsense * RSENSE_LSB_UOHM))
+
+
+def sbs_voltage(voltage: int):
+    '''
+    Cell voltage (78.125uV) to SBS voltage (mV)
+    '''
+    return _word(voltage * VOLTAGE_LSB_MV)
+
+
+def sbs_temperature(temp: int):
+    '''
+    Temperature (1/256 degC, signed) to SBS temperature (0.1K)
+    '''
+    return _word((_signed(temp) * TEMP_LSB_C + 273.15) * 10)
+
+
+def sbs_cycles(cycles: int):
+    '''
+    Cycles (25%) to SBS cycle count
+    '''
+    return _word(cycles * CYCLES_LSB_PCT // 100)
+
+
+#SBS registers which mirror M5 registers. Maps the SBS register address to the
+#addresses of the registers it's worked out from, and the conversion taking
+#their values in the same order
+SBS_DERIVATIONS = {
+    0x108 : ((0x01B,),               sbs_temperature),   #sTemperature <- Temp
+    0x10A : ((0x01C, NRSENSE_ADDR),  sbs_current),       #sCurrent <- Current
+    0x10B : ((0x01D, NRSENSE_ADDR),  sbs_current),       #sAvgCurrent <- AvgCurrent
+    0x117 : ((0x017,),               sbs_cycles),        #sCycles <- Cycles
+    0x118 : ((0x018, NRSENSE_ADDR),  sbs_capacity),      #sDesignCap <- DesignCap
+    0x13F : ((0x0D8,),               sbs_voltage),       #sCell1 <- CELL1
+    0x14F : ((0x0D4,),               sbs_voltage),       #sAvgCell1 <- AvgCell1
+    0x167 : ((0x01F, NRSENSE_ADDR),  sbs_capacity),      #sAvCap <- AvCap
+    0x168 : ((0x02B, NRSENSE_ADDR),  sbs_capacity),      #sMixCap <- MixCap
+}
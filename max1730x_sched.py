@@ -0,0 +1,121 @@
+#
+# Fixed rate scheduling of the logging snapshots. Ticks are kept to absolute
+# deadlines on the monotonic clock, so loop overhead and wall clock changes
+# don't drift the interval.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+import time
+
+#What to do after a tick overruns past the next deadline. Skip drops the ticks
+#which were missed and carries on from the latest one. Catch up runs them all,
+#back to back, until the schedule is caught up
+SCHED_SKIP = 'skip'
+SCHED_CATCH_UP = 'catch-up'
+SCHED_POLICIES = [SCHED_SKIP, SCHED_CATCH_UP]
+
+#Intervals shorter than this (in seconds) are too short to trust to the OS
+#sleep alone. The wait sleeps until SPIN_MARGIN before the deadline, then
+#polls the clock for the rest
+SPIN_INTERVAL = 0.010
+SPIN_MARGIN_NS = 2000000
+
+
+class tick_scheduler:
+    '''
+    Paces a loop to a fixed interval. Each tick's deadline is the previous
+    deadline plus the interval, on time.monotonic_ns(), so time spent in the
+    loop never shifts the ones after it.
+
+    A tick which starts late by a full interval or more has missed at least
+    one deadline. How that's handled depends on the policy (see
+    SCHED_POLICIES), and the ticks skipped are counted in missed. How late
+    each tick starts is kept as its jitter.
+
+    An interval of 0 or less free-runs: every tick is straight away, and
+    nothing is ever missed or late.
+    '''
+    def __init__(self, interval: float, policy: str = SCHED_SKIP,
+                 spin_interval: float = SPIN_INTERVAL):
+        '''
+        :param interval: Tick interval in seconds. 0 or less free-runs
+        :param policy: One of SCHED_POLICIES
+        :param spin_interval: Intervals shorter than this, in seconds, finish
+                              each wait by polling the clock rather than
+                              sleeping
+        '''
+        if policy not in SCHED_POLICIES:
+            raise ValueError('{} is not a scheduling policy'.format(policy))
+        self.interval_ns = max(0, int(round(interval * 1e9)))
+        self.policy = policy
+        self.spin = interval < spin_interval
+        self.deadline_ns = None
+        self.ticks = 0
+        self.missed = 0
+        self.__jitter_ct = 0
+        self.__jitter_sum = 0
+        self.__jitter_max = 0
+
+    def __wait_until(self, deadline_ns: int):
+        '''
+        Waits for the monotonic clock to reach deadline_ns
+        '''
+        while True:
+            remaining = deadline_ns - time.monotonic_ns()
+            if remaining <= 0:
+                return
+            if not self.spin:
+                #Sleep can come back a little early, so check again after
+                time.sleep(remaining / 1e9)
+            elif remaining > SPIN_MARGIN_NS:
+                time.sleep((remaining - SPIN_MARGIN_NS) / 1e9)
+
+    def wait(self):
+        '''
+        Waits for the next tick. The first tick is straight away
+
+        :return: Number of whole intervals the tick started late by. When
+                 skipping, these are the ticks missed before this one. When
+                 catching up, it's how far behind the schedule is
+        '''
+        self.ticks += 1
+        if self.interval_ns == 0:
+            return 0
+        now = time.monotonic_ns()
+        if self.deadline_ns is None:
+            self.deadline_ns = now
+        else:
+            self.deadline_ns += self.interval_ns
+
+        behind = max(0, now - self.deadline_ns) // self.interval_ns
+        if (self.policy == SCHED_SKIP) and behind:
+            self.deadline_ns += behind * self.interval_ns
+            self.missed += behind
+
+        self.__wait_until(self.deadline_ns)
+        jitter = time.monotonic_ns() - self.deadline_ns
+        self.__jitter_ct += 1
+        self.__jitter_sum += jitter
+        self.__jitter_max = max(self.__jitter_max, jitter)
+        return behind
+
+    def jitter_stats(self):
+        '''
+        Gets how late the ticks have started since the last call, and starts
+        over for the next
+
+        :return: Tuple of the mean and max jitter in seconds, 0 if no ticks
+        '''
+        ct = self.__jitter_ct
+        stats = ((self.__jitter_sum / ct / 1e9) if ct else 0.0, self.__jitter_max / 1e9)
+        self.__jitter_ct = 0
+        self.__jitter_sum = 0
+        self.__jitter_max = 0
+        return stats
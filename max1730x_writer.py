@@ -0,0 +1,137 @@
+#
+# Writes the logged rows out on a thread of its own, so a slow write to the
+# output file doesn't hold up the next snapshot.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+from collections import deque
+import threading
+
+#What to do with a new row when the queue is full. Block waits for the writer
+#to make room, holding up the snapshots. Drop oldest throws away the oldest
+#queued row to make room, drop newest throws away the new row
+BACKPRESSURE_BLOCK = 'block'
+BACKPRESSURE_DROP_OLDEST = 'drop-oldest'
+BACKPRESSURE_DROP_NEWEST = 'drop-newest'
+BACKPRESSURE_POLICIES = [BACKPRESSURE_BLOCK, BACKPRESSURE_DROP_OLDEST, BACKPRESSURE_DROP_NEWEST]
+
+#Default number of rows which can be waiting to be written
+WRITER_QUEUE_SIZE = 1000
+
+
+class LogWriterError(IOError):
+    '''
+    Raised once the writer thread has stopped on an error writing a row. The
+    original exception is the cause
+    '''
+    pass
+
+
+class log_writer:
+    '''
+    Hands rows from the logging loop to a writer thread through a bounded
+    queue. The write function is only ever called on the writer thread, so it
+    can do the formatting as well as the output.
+
+    If the write function raises, the thread stops, the queued rows are
+    discarded and a LogWriterError is raised from every put() after.
+    '''
+    def __init__(self, write, queue_size: int = WRITER_QUEUE_SIZE,
+                 backpressure: str = BACKPRESSURE_BLOCK):
+        '''
+        :param write: Function taking a row, as given to put(), and writing it
+        :param queue_size: Number of rows which can be waiting to be written
+        :param backpressure: One of BACKPRESSURE_POLICIES
+        '''
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError('{} is not a backpressure policy'.format(backpressure))
+        self.queue_size = max(1, queue_size)
+        self.backpressure = backpressure
+        self.written = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.error = None
+        self.__write = write
+        self.__queue = deque()
+        self.__cond = threading.Condition()
+        self.__closed = False
+        self.__thread = threading.Thread(target = self.__run, name = 'log_writer', daemon = True)
+        self.__thread.start()
+
+    def __run(self):
+        while True:
+            #Take one row at a time, so the only row held outside the queue
+            #(where drop-oldest can't reach it) is the one being written. Write
+            #it without holding the lock so the logging loop can keep adding
+            with self.__cond:
+                while not self.__queue and not self.__closed:
+                    self.__cond.wait()
+                if not self.__queue:
+                    return
+                row = self.__queue.popleft()
+                self.__cond.notify_all()
+            try:
+                self.__write(row)
+                self.written += 1
+            except Exception as ex:
+                with self.__cond:
+                    self.error = ex
+                    self.__queue.clear()
+                    self.__cond.notify_all()
+                return
+
+    def depth(self):
+        '''
+        Gets the number of rows waiting to be written
+        '''
+        return len(self.__queue)
+
+    def __check(self):
+        '''
+        Raises the writer's error, if it has stopped. Called with the lock held
+        '''
+        if self.error is not None:
+            raise LogWriterError('Writing the log failed: {}'.format(self.error)) from self.error
+
+    def put(self, row):
+        '''
+        Queues a row to be written, applying the backpressure policy if the
+        queue is full
+
+        :param row: Row to pass to the write function
+        :return: True if the row was queued, False if it was dropped
+        :raises: LogWriterError if the writer has stopped
+        '''
+        with self.__cond:
+            self.__check()
+            if len(self.__queue) >= self.queue_size:
+                if self.backpressure == BACKPRESSURE_DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                elif self.backpressure == BACKPRESSURE_DROP_OLDEST:
+                    self.__queue.popleft()
+                    self.dropped += 1
+                else:
+                    while (len(self.__queue) >= self.queue_size) and (self.error is None):
+                        self.__cond.wait()
+                    self.__check()
+            self.__queue.append(row)
+            self.max_depth = max(self.max_depth, len(self.__queue))
+            self.__cond.notify_all()
+            return True
+
+    def close(self):
+        '''
+        Writes out whatever is still queued, then stops the writer thread
+        '''
+        with self.__cond:
+            self.__closed = True
+            self.__cond.notify_all()
+        self.__thread.join()
@@ -0,0 +1,643 @@
+#
+# Interfaces class for talking I2C through the MPSSE engine of a FTDI2232,
+# independent of the library used to access the device. Implements I_I2C
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+from i2c_iface import I_I2C, I2C_ReadRequest, I2CNackError, split_read_requests, join_read_results, \
+                      I2C_MIN_CLOCK, I2C_MAX_CLOCK
+from struct import unpack
+from time import sleep, monotonic
+
+# Constants for building commands for the FTDI MPSSE. Taken from the libMPSSE
+# source code
+CMD_SET_DATABITS_LOW    = 0x80
+CMD_DATAOUT_NEG_EDGE    = 0x13
+CMD_DATAIN_POS_EDGE     = 0x22
+CMD_SEND_IMMEDIATE      = 0x87
+CMD_CLKDIV5_DISABLE     = 0x8A
+CMD_3PHASE_ENABLE       = 0x8C
+CMD_ADAPTIVE_DISABLE    = 0x97
+CMD_SET_CLOCK           = 0x86
+CMD_BAD_COMMAND         = 0xAA
+RSP_BAD_COMMAND         = 0xFA
+DATASIZE_1BIT           = 0x00
+DATASIZE_8BITS          = 0x07
+DATA_SEND_NACK          = 0x80
+DATA_SEND_ACK           = 0x00
+VAL_SCLHI_SDAHI         = 0x03
+VAL_SCLHI_SDALO         = 0x01
+VAL_SCLLO_SDALO         = 0x00
+VAL_SCLLO_SDAHI         = 0x02
+DIR_SCLOUT_SDAOUT       = 0x13
+DIR_SCLIN_SDAIN         = 0x10
+DIR_SCLOUT_SDAIN        = 0x11
+
+#Purge masks for the device's receive and transmit buffers
+FT_PURGE_RX             = 0x01
+FT_PURGE_TX             = 0x02
+
+#Maximum number of SCL pulses given to a target holding SDA low. Enough to
+#clock out the rest of a byte plus its ACK
+RECOVERY_CLOCKS         = 9
+
+#Sizes used when grouping transactions into a single write. A read transaction
+#is 2 starts, 3 address bytes and a stop, plus a fixed size per byte read. The
+#FTDI responds with an ACK byte for each of the 3 address bytes plus the data.
+TXN_CMD_BYTES           = 2*93 + 3*11 + 93
+READ_BYTE_CMD_BYTES     = 14
+TXN_ACK_BYTES           = 3
+
+#Offsets of the variable fields within a read transaction's command stream.
+#The data byte sits 5 bytes into each write byte sequence
+TXN_DEV_WR_OFFSET       = 93 + 5
+TXN_REG_OFFSET          = 93 + 11 + 5
+TXN_DEV_RD_OFFSET       = 2*93 + 2*11 + 5
+
+#The FT2232H has a 4kB receive buffer per channel. Keeping the responses of a
+#group within it means the MPSSE never stalls waiting on the host to read
+FT_RX_BUFFER_SIZE       = 4096
+FT_MAX_WRITE_SIZE       = 65536
+
+#With the divide by 5 disabled the MPSSE runs from a 60MHz master clock. Three
+#phase clocking (needed so SDA is held past the falling edge of SCL) stretches
+#each bit to 3 half periods, so the bus rate is 60MHz / ((1 + divisor) * 3)
+FT_MASTER_CLOCK         = 60000000
+FT_DEFAULT_I2C_CLOCK    = 100000
+
+#USB settings. The D2XX driver defaults to 4kB transfers, and the latency timer
+#is how long the FTDI holds a partially filled packet before sending it.
+#Transfer sizes must be a multiple of 64 bytes, and each 512 byte high speed
+#packet carries 2 modem status bytes ahead of the data
+FT_DEFAULT_LATENCY      = 8
+FT_DEFAULT_TRANSFER     = 4096
+FT_MIN_TRANSFER         = 64
+FT_MAX_TRANSFER         = 65536
+FT_USB_PACKET_SIZE      = 512
+FT_USB_STATUS_BYTES     = 2
+
+#Total time allowed for a response to arrive, in seconds, and the timeouts
+#given to the device for each individual read/write call, in ms
+FT_READ_TIMEOUT         = 1.0
+FT_READ_POLL_MS         = 50
+FT_WRITE_TIMEOUT_MS     = 1000
+
+#Limits for the automatically selected latency timer, in ms
+FT_AUTO_LATENCY_MIN     = 2
+FT_AUTO_LATENCY_MAX     = 16
+
+#Maximum number of entries held in each of the command caches before they are
+#cleared and rebuilt
+FT_CMD_CACHE_SIZE       = 256
+
+
+class mpsse_i2c_commands:
+    '''
+    Builder for the MPSSE command streams making up the I2C transactions.
+
+    The build_* methods construct the streams from scratch as lists. The fixed
+    start/stop/read sequences are converted to bytes once at init, and complete
+    read transactions are built from a per byte count template with only the
+    address and register bytes patched in. Finished transactions and batches
+    are cached, so repeating the same reads (as the logger does every interval)
+    costs a dictionary lookup rather than rebuilding the command stream.
+    '''
+    def __init__(self):
+        self.start = bytes(self.build_start())
+        self.stop = bytes(self.build_stop())
+        self.read_ack = bytes(self.build_read_byte(False))
+        self.read_nack = bytes(self.build_read_byte(True))
+        self.__templates = {}
+        self.__txn_cache = {}
+        self.__batch_cache = {}
+
+    @staticmethod
+    def build_start():
+        '''
+        Builds the command stream for a I2C bus start action. This logic was
+        taken directly from MPSSE.
+        :return: List of command bytes
+        '''
+        START_DUR_1 = 10
+        START_DUR_2 = 20
+        cmd_data = [CMD_SET_DATABITS_LOW, VAL_SCLHI_SDAHI, DIR_SCLOUT_SDAOUT] * START_DUR_1
+        cmd_data.extend([CMD_SET_DATABITS_LOW, VAL_SCLHI_SDALO, DIR_SCLOUT_SDAOUT] * START_DUR_2)
+        cmd_data.extend([CMD_SET_DATABITS_LOW, VAL_SCLLO_SDALO, DIR_SCLOUT_SDAOUT])
+        return cmd_data
+
+    @staticmethod
+    def build_stop():
+        '''
+        Builds the command stream for a I2C bus stop action. This logic was
+        taken directly from MPSSE.
+        :return: List of command bytes
+        '''
+        STOP_DUR_1 = 10
+        STOP_DUR_2 = 10
+        STOP_DUR_3 = 10
+        cmd_data = [CMD_SET_DATABITS_LOW, VAL_SCLLO_SDALO, DIR_SCLOUT_SDAOUT] * STOP_DUR_1
+        cmd_data.extend([CMD_SET_DATABITS_LOW, VAL_SCLHI_SDALO, DIR_SCLOUT_SDAOUT] * STOP_DUR_2)
+        cmd_data.extend([CMD_SET_DATABITS_LOW, VAL_SCLHI_SDAHI, DIR_SCLOUT_SDAOUT] * STOP_DUR_3)
+        cmd_data.extend([CMD_SET_DATABITS_LOW, VAL_SCLHI_SDAHI, DIR_SCLIN_SDAIN])
+        return cmd_data
+
+    @staticmethod
+    def build_write_byte(data):
+        '''
+        Builds the command stream to write a byte (could be data or the device
+        address) and clock in the ACK/NACK bit from the bus.  The ACK bit is
+        returned by the FTDI as a single byte, with the bit in the lsb.
+        :param data: Data byte to write
+        :return: List of command bytes
+        '''
+        cmd_data = [CMD_SET_DATABITS_LOW, VAL_SCLLO_SDAHI, DIR_SCLOUT_SDAOUT]
+        cmd_data.extend([CMD_DATAOUT_NEG_EDGE, DATASIZE_8BITS, data])
+        cmd_data.extend([CMD_SET_DATABITS_LOW, VAL_SCLLO_SDALO, DIR_SCLOUT_SDAIN])
+        cmd_data.extend([CMD_DATAIN_POS_EDGE, DATASIZE_1BIT])
+        return cmd_data
+
+    @staticmethod
+    def build_read_byte(nack = False):
+        '''
+        Builds the command stream to read a byte from the I2C bus and provide
+        the corresponding end bit (ACK or NACK).
+        :param: nack (Default False), NACK the bus instead of ACK
+        :return: List of command bytes
+        '''
+        cmd_data = [CMD_SET_DATABITS_LOW, VAL_SCLLO_SDALO, DIR_SCLOUT_SDAIN]
+        cmd_data.extend([CMD_DATAIN_POS_EDGE, DATASIZE_8BITS])
+        if nack:
+            cmd_data.extend([CMD_SET_DATABITS_LOW, VAL_SCLLO_SDALO, DIR_SCLOUT_SDAIN])
+            cmd_data.extend([CMD_DATAOUT_NEG_EDGE, DATASIZE_1BIT, DATA_SEND_NACK])
+        else:
+            cmd_data.extend([CMD_SET_DATABITS_LOW, VAL_SCLLO_SDALO, DIR_SCLOUT_SDAOUT])
+            cmd_data.extend([CMD_DATAOUT_NEG_EDGE, DATASIZE_1BIT, DATA_SEND_ACK])
+        cmd_data.extend([CMD_SET_DATABITS_LOW, VAL_SCLLO_SDALO, DIR_SCLIN_SDAIN])
+        return cmd_data
+
+    @classmethod
+    def build_read_transaction(cls, bus_addr, reg_addr, num_bytes):
+        '''
+        Builds the command stream for a complete register read: start, device
+        address (write), register address, repeated start, device address
+        (read), num_bytes of reads and a stop. The FTDI responds with the 3 ACK
+        bits for the address bytes followed by the data bytes.
+        Note: This NACK's on the last data byte
+        :param bus_addr: Address of the device on the bus (8-bit)
+        :param reg_addr: Register address to start reading from
+        :param num_bytes: Number of bytes to read
+        :return: List of command bytes
+        '''
+        cmd_data = cls.build_start()
+        cmd_data.extend(cls.build_write_byte(bus_addr & 0xFE))
+        cmd_data.extend(cls.build_write_byte(reg_addr))
+        cmd_data.extend(cls.build_start())
+        cmd_data.extend(cls.build_write_byte((bus_addr & 0xFE) | 0x1))
+        for i in range(num_bytes):
+            cmd_data.extend(cls.build_read_byte(i==(num_bytes-1)))
+        cmd_data.extend(cls.build_stop())
+        return cmd_data
+
+    def __template(self, num_bytes):
+        '''
+        Gets the read transaction template for num_bytes, building it on first
+        use. The address and register bytes are left as 0.
+        :param num_bytes: Number of bytes to read
+        :return: bytearray of the command stream
+        '''
+        tmpl = self.__templates.get(num_bytes)
+        if tmpl is None:
+            write_byte = bytes(self.build_write_byte(0))
+            tmpl = bytearray(self.start)
+            tmpl += write_byte * 2
+            tmpl += self.start
+            tmpl += write_byte
+            tmpl += self.read_ack * (num_bytes - 1)
+            tmpl += self.read_nack
+            tmpl += self.stop
+            self.__templates[num_bytes] = tmpl
+        return tmpl
+
+    def read_transaction(self, bus_addr, reg_addr, num_bytes):
+        '''
+        Gets the command stream for a complete register read, as per
+        build_read_transaction()
+        :param bus_addr: Address of the device on the bus (8-bit)
+        :param reg_addr: Register address to start reading from
+        :param num_bytes: Number of bytes to read
+        :return: bytes of the command stream
+        '''
+        key = (bus_addr & 0xFE, reg_addr, num_bytes)
+        cmd_data = self.__txn_cache.get(key)
+        if cmd_data is None:
+            txn = bytearray(self.__template(num_bytes))
+            txn[TXN_DEV_WR_OFFSET] = bus_addr & 0xFE
+            txn[TXN_REG_OFFSET] = reg_addr
+            txn[TXN_DEV_RD_OFFSET] = (bus_addr & 0xFE) | 0x1
+            cmd_data = bytes(txn)
+            if len(self.__txn_cache) >= FT_CMD_CACHE_SIZE:
+                self.__txn_cache.clear()
+            self.__txn_cache[key] = cmd_data
+        return cmd_data
+
+    def read_batch(self, requests):
+        '''
+        Gets the command streams for a batch of register reads. The requests are
+        split into groups whose commands and responses fit within the FTDI's
+        buffers, each group ending with a send immediate.
+        :param requests: Sequence of I2C_ReadRequest
+        :return: List of groups. Each group is a tuple of the command stream
+                 (bytes), the response size, and a tuple of (request, offset)
+                 pairs, offset being the start of the request's ACK bytes
+                 within the response
+        '''
+        key = tuple(requests)
+        groups = self.__batch_cache.get(key)
+        if groups is not None:
+            return groups
+
+        groups = []
+        cmd_data = bytearray()
+        layout = []
+        rsp_size = 0
+        for r in key:
+            r_cmd = TXN_CMD_BYTES + (READ_BYTE_CMD_BYTES * r.num_bytes)
+            r_rsp = TXN_ACK_BYTES + r.num_bytes
+            if layout and ((len(cmd_data) + r_cmd >= FT_MAX_WRITE_SIZE) or
+                           (rsp_size + r_rsp > FT_RX_BUFFER_SIZE)):
+                cmd_data.append(CMD_SEND_IMMEDIATE)
+                groups.append((bytes(cmd_data), rsp_size, tuple(layout)))
+                cmd_data = bytearray()
+                layout = []
+                rsp_size = 0
+            cmd_data += self.read_transaction(r.bus_addr, r.reg_addr, r.num_bytes)
+            layout.append((r, rsp_size))
+            rsp_size += r_rsp
+        if layout:
+            cmd_data.append(CMD_SEND_IMMEDIATE)
+            groups.append((bytes(cmd_data), rsp_size, tuple(layout)))
+
+        if len(self.__batch_cache) >= FT_CMD_CACHE_SIZE:
+            self.__batch_cache.clear()
+        self.__batch_cache[key] = groups
+        return groups
+
+
+class mpsse_i2c(I_I2C):
+    '''
+    FTDI MPSSE implementation of the I_I2C interface class. This class holds
+    all of the I2C logic, operating on an already opened device handle. The
+    handle needs to provide the ftd2xx style methods used here (write, read,
+    setLatencyTimer, setBitMode), so that each FTDI library only needs a thin
+    subclass to open the device. See ftd2xx_i2c and pylibftdi_i2c.
+
+    The code here was lifted from the MPSSE library code provided by FTDI, and
+    is unfortunately a little bit of magic in terms of commands.
+
+    By default (batched = True), each register read is sent to the FTDI as one
+    command stream and the ACK bits and data come back in one read. Setting
+    batched to False falls back to a USB round trip per byte, which can be
+    handy when probing the bus with a logic analyzer.
+
+    The I2C clock defaults to 100kHz. Any rate up to 400kHz supported by the
+    MAX1730x may be passed as clock_hz, or changed later with set_clock().
+
+    The USB latency timer and transfer sizes can be set with set_usb_params(),
+    or picked to suit a set of reads with auto_usb_params().
+    '''
+    #A single read's response has to fit in the FTDI's receive buffer along
+    #with its ACK bits
+    MAX_READ_BYTES = (FT_RX_BUFFER_SIZE - TXN_ACK_BYTES) & ~0x1
+
+    def __init__(self, dev, batched: bool = True,
+                 clock_hz: int = FT_DEFAULT_I2C_CLOCK,
+                 read_timeout: float = FT_READ_TIMEOUT):
+        '''
+        :param dev: Opened FTDI device handle
+        :param batched: Send each transaction as a single command stream
+        :param clock_hz: I2C clock rate in Hz
+        :param read_timeout: Total time to wait for a response, in seconds
+        '''
+        self.__dev = dev
+        self.__batched = batched
+        self.__cmds = mpsse_i2c_commands()
+        self.__read_timeout = read_timeout
+        self.__rx_buf = bytearray(FT_RX_BUFFER_SIZE)
+        self.__short_reads = 0
+        self.__read_timeouts = 0
+        self.__resyncing = False
+        self.__dev.setTimeouts(FT_READ_POLL_MS, FT_WRITE_TIMEOUT_MS)
+        self.__usb_in = FT_DEFAULT_TRANSFER
+        self.__usb_out = FT_DEFAULT_TRANSFER
+        self.__latency = FT_DEFAULT_LATENCY
+        self.__dev.setLatencyTimer(self.__latency)
+        self.__dev.setBitMode(0, 0) #Reset MPSSE
+        self.__dev.setBitMode(0, 2) #Enable MPSSE
+
+        #Anything left in the buffers (e.g. by the EvKit GUI) would be taken as
+        #the sync response, so throw it away first
+        sleep(0.05)
+        self.__dev.purge(FT_PURGE_RX | FT_PURGE_TX)
+        self.__ft_sync()
+
+        #60MHz master clock, no adaptive clocking, 3-phase clocking for I2C
+        self.__ft_write([CMD_CLKDIV5_DISABLE, CMD_ADAPTIVE_DISABLE, CMD_3PHASE_ENABLE])
+        self.set_clock(clock_hz)
+
+        #Set IO Pin States
+        self.__ft_write([CMD_SET_DATABITS_LOW, 0x13, 0x13])
+
+    def __ft_sync(self):
+        '''
+        Syncs up with the MPSSE by sending a bogus command, and waiting for the
+        bad command response. The read queue needs purging first, as anything
+        left in it is read as the response
+        :raises: IOError if the response doesn't come back
+        '''
+        self.__ft_write([CMD_BAD_COMMAND])
+        if self.__ft_read(2) != bytes([RSP_BAD_COMMAND, CMD_BAD_COMMAND]):
+            raise IOError('Failed to synchronize with the FTDI MPSSE')
+
+    def __resync(self):
+        '''
+        Throws away what's left of a response which didn't all arrive, so any
+        late bytes aren't taken as the start of the next one, and gets back in
+        step with the MPSSE. A failure here is left for the caller's error
+        handling (and bus recovery) to deal with
+        '''
+        if self.__resyncing:
+            return
+        self.__resyncing = True
+        try:
+            self.__dev.purge(FT_PURGE_RX | FT_PURGE_TX)
+            self.__ft_sync()
+        except Exception:
+            pass
+        finally:
+            self.__resyncing = False
+
+    def recover_bus(self):
+        #Throw away anything half sent or received, and get back in step with
+        #the MPSSE in case it was part way through a command
+        self.__dev.purge(FT_PURGE_RX | FT_PURGE_TX)
+        self.__ft_sync()
+
+        #With SDA released, pulse SCL until the target lets go of SDA. Each
+        #pulse samples SDA, so this stops as soon as the bus is free
+        released = False
+        cmd_data = [CMD_SET_DATABITS_LOW, VAL_SCLLO_SDAHI, DIR_SCLOUT_SDAIN,
+                    CMD_DATAIN_POS_EDGE, DATASIZE_1BIT, CMD_SEND_IMMEDIATE]
+        for _ in range(RECOVERY_CLOCKS):
+            self.__ft_write(cmd_data)
+            if self.__ft_read(1)[0] & 0x1:
+                released = True
+                break
+
+        #A STOP resets the state machine of every target on the bus
+        self.__ft_write(self.__cmds.stop)
+        return released
+
+    def set_clock(self, clock_hz: int):
+        if not (I2C_MIN_CLOCK <= clock_hz <= I2C_MAX_CLOCK):
+            raise ValueError('{} Hz is outside the supported I2C clock range'.format(clock_hz))
+        #Round the divisor up, so the actual rate never exceeds the request.
+        #The range keeps it well within the 16 bits of the divisor
+        div = -(-FT_MASTER_CLOCK // int(3 * clock_hz)) - 1
+        self.__ft_write([CMD_SET_CLOCK, div % 256, div // 256])
+        self.__clock_hz = FT_MASTER_CLOCK / ((1 + div) * 3)
+        return self.__clock_hz
+
+    def get_clock(self):
+        return self.__clock_hz
+
+    def set_usb_params(self, latency_ms: int = None, in_size: int = None,
+                       out_size: int = None):
+        if latency_ms is not None:
+            self.__dev.setLatencyTimer(latency_ms)
+            self.__latency = latency_ms
+        if (in_size is not None) or (out_size is not None):
+            in_size = self.__usb_in if in_size is None else in_size
+            out_size = self.__usb_out if out_size is None else out_size
+            self.__dev.setUSBParameters(in_size, out_size)
+            self.__usb_in = in_size
+            self.__usb_out = out_size
+        return (self.__latency, self.__usb_in, self.__usb_out)
+
+    def auto_usb_params(self, requests: list):
+        #Size the transfers to carry the largest group of the batch in one go,
+        #accounting for the status bytes at the start of each IN packet
+        groups = self.__cmds.read_batch(requests)
+        rsp_size = max(g[1] for g in groups)
+        payload = FT_USB_PACKET_SIZE - FT_USB_STATUS_BYTES
+        rsp_size += FT_USB_STATUS_BYTES * -(-rsp_size // payload)
+        cmd_size = max(len(g[0]) for g in groups)
+        in_size = min(max(-(-rsp_size // FT_MIN_TRANSFER) * FT_MIN_TRANSFER, FT_MIN_TRANSFER), FT_MAX_TRANSFER)
+        out_size = min(max(-(-cmd_size // FT_MIN_TRANSFER) * FT_MIN_TRANSFER, FT_MIN_TRANSFER), FT_MAX_TRANSFER)
+
+        #Every batch ends with a send immediate, so the latency timer only
+        #decides how often partially filled packets go out while a long batch
+        #is still running. Match it to the time the bus takes to fill a packet
+        #(9 clocks per byte) so packets go out full, within sensible limits
+        latency = -(-payload * 9 * 1000 // int(self.__clock_hz))
+        latency = min(max(latency, FT_AUTO_LATENCY_MIN), FT_AUTO_LATENCY_MAX)
+        return self.set_usb_params(latency, in_size, out_size)
+
+    def __ft_write(self, data):
+        '''
+        Writes a byte stream to the FTDI for processing
+
+        :param data: Iterable of bytes to send
+        :return: Result from the write command
+        '''
+        s = data if type(data) is bytes else bytes(data)
+        return self.__dev.write(s)
+
+    def __ft_read(self, nbytes):
+        '''
+        Reads the specified number of bytes from the FTDI device and converts to
+        bytes depending on the return value. The device may return fewer bytes
+        than asked for (USB transfers split up, or the response still coming
+        in). Those are gathered into a preallocated buffer until all of the
+        bytes arrive, or the read timeout passes.
+        :param nbytes: Number of bytes to read
+        :return: Bytes read
+        :raises: TimeoutError if the bytes don't all arrive in time
+        '''
+        s = self.__dev.read(nbytes)
+        if type(s) is str:
+            s = bytes([ord(c) for c in s])
+        if len(s) >= nbytes:
+            return bytes(s)
+
+        #Short read. Keep going until everything is in
+        self.__short_reads += 1
+        if len(self.__rx_buf) < nbytes:
+            self.__rx_buf = bytearray(nbytes)
+        buf = memoryview(self.__rx_buf)
+        got = len(s)
+        buf[:got] = s
+        deadline = monotonic() + self.__read_timeout
+        while got < nbytes:
+            if monotonic() > deadline:
+                self.__read_timeouts += 1
+                self.__resync()
+                raise TimeoutError('Timed out reading from the FTDI: {:d} of {:d} bytes received'.format(
+                                   got, nbytes))
+            s = self.__dev.read(nbytes - got)
+            if type(s) is str:
+                s = bytes([ord(c) for c in s])
+            buf[got:got + len(s)] = s
+            got += len(s)
+        return bytes(buf[:nbytes])
+
+    def get_stats(self):
+        return {'Short Reads' : self.__short_reads,
+                'Read Timeouts' : self.__read_timeouts}
+
+    def __ft_i2c_start(self):
+        '''
+        Performs a I2C bus start action.
+        '''
+        self.__ft_write(self.__cmds.start)
+
+    def __ft_i2c_stop(self):
+        '''
+        Performs a I2C bus stop action.
+        '''
+        self.__ft_write(self.__cmds.stop)
+
+    def __ft_i2c_write_get_ack(self, data, bus_addr, reg_addr, byte_index):
+        '''
+        Writes the specified data byte (could be data or the device address) and
+        gets the response (ACK/NACK) from the bus.  If an ACK, this returns
+        normally, if a NACK, the bus is stopped and this throws a I2CNackError.
+        :param data: Data byte to write
+        :param bus_addr: Device address of the transaction, for error reporting
+        :param reg_addr: Register address of the transaction, for error reporting
+        :param byte_index: Index of the byte within the transaction, for error
+                           reporting. See NACK_BYTE_NAMES
+        :raises: I2CNackError on a NACK
+        '''
+        cmd_data = self.__cmds.build_write_byte(data)
+        cmd_data.append(CMD_SEND_IMMEDIATE)
+        self.__ft_write(cmd_data)
+        result = self.__ft_read(1)
+        #Throw an exception on a NACK
+        if result[0] & 0x1:
+            self.__ft_i2c_stop()
+            raise I2CNackError(bus_addr, reg_addr, byte_index)
+
+    def __ft_i2c_read_give_ack(self, nack = False):
+        '''
+        Reads a byte from the I2C bus and provides the corresponding end bit
+        (ACK or NACK).
+        :param: nack (Default False), NACK the bus instead of ACK
+        '''
+        cmd_data = self.__cmds.build_read_byte(nack)
+        cmd_data.append(CMD_SEND_IMMEDIATE)
+        self.__ft_write(cmd_data)
+        return self.__ft_read(1)[0]
+
+    def __ft_i2c_dev_addr(self, bus_addr, reg_addr, read = False):
+        '''
+        Sends the device address to the bus correctly depending if it is a read
+        or write action.
+        :param bus_addr: 8-bit device address. Lowest bit is ignored
+        :param reg_addr: Register address of the transaction, for error reporting
+        :param read: Read operation (lsb will get set)
+        '''
+        addr = (bus_addr & 0xFE)
+        if read:
+            addr |= 0x1
+        self.__ft_i2c_write_get_ack(addr, bus_addr, reg_addr, 2 if read else 0)
+
+    def __ft_i2c_write_reg_addr(self, bus_addr, reg_addr, stop = False ):
+        '''
+        Performs a write transaction for reg address. Starts the bus, sends the
+        device address then the register address. A stop bit is optional
+        :param bus_addr: Address of the device on the bus (8-bit)
+        :param reg_addr: Register address (data byte to send)
+        :param stop: Send a stop bit or not
+        '''
+        self.__ft_i2c_start()
+        self.__ft_i2c_dev_addr(bus_addr, reg_addr)
+        self.__ft_i2c_write_get_ack(reg_addr, bus_addr, reg_addr, 1)
+        if stop:
+            self.__ft_i2c_stop()
+
+    def __ft_i2c_read_bytes(self, bus_addr, reg_addr, num_bytes, stop = True):
+        '''
+        Performs a read transaction. Starts the bus, sends the device address
+        then perform num_bytes worth of reads. A stop bit is optional.
+        Note: This currently NACK's on the last data byte
+        :param bus_addr: Address of the device on the bus (8-bit)
+        :param reg_addr: Register address of the transaction, for error reporting
+        :param num_bytes: Number of bytes to read
+        :param stop: Send a stop bit or not
+        '''
+        out_data = []
+        self.__ft_i2c_start()
+        self.__ft_i2c_dev_addr(bus_addr, reg_addr, read=True)
+        for i in range(num_bytes):
+            out_data.append(self.__ft_i2c_read_give_ack(i==(num_bytes-1)))
+        if stop:
+            self.__ft_i2c_stop()
+        return out_data
+
+    def __ft_i2c_read(self, bus_addr, reg_addr, num_bytes):
+        '''
+        Reads num_bytes starting at reg_addr, either as a single batched
+        transaction or byte by byte depending on the mode selected at init.
+        :param bus_addr: Address of the device on the bus (8-bit)
+        :param reg_addr: Register address to start reading from
+        :param num_bytes: Number of bytes to read
+        :return: Bytes read
+        '''
+        if self.__batched:
+            return self.i2c_read_batch([I2C_ReadRequest(bus_addr, reg_addr, num_bytes)])[0]
+        self.__ft_i2c_write_reg_addr(bus_addr, reg_addr, False)
+        return bytes(self.__ft_i2c_read_bytes(bus_addr, reg_addr, num_bytes, True))
+
+    def i2c_read_words(self, bus_addr:int , reg_addr: int, num_words: int):
+        rd = self.__ft_i2c_read(bus_addr, reg_addr, num_words*2)
+        #< for little endian, H for unsigned short
+        return unpack('<' + 'H'*num_words, bytes(rd))
+
+    def sbs_block_read(self, bus_addr: int, reg_addr: int, num_bytes: int):
+        return self.__ft_i2c_read(bus_addr, reg_addr, num_bytes)
+
+    def sbs_word_read(self, bus_addr: int, reg_addr: int):
+        return self.i2c_read_words(bus_addr, reg_addr, 1)[0]
+
+    def i2c_read_batch(self, requests: list):
+        if not self.__batched:
+            return super().i2c_read_batch(requests)
+        requests, counts = split_read_requests(requests, self.MAX_READ_BYTES)
+
+        #Each group is sent as a single stream, and the whole response read
+        #back at once. The response for each request is the 3 ACK bits for the
+        #address bytes, then the data. The ACK bits are only checked once all
+        #of the responses are in, rather than waiting on each one in turn
+        responses = []
+        for cmd_data, rsp_size, layout in self.__cmds.read_batch(requests):
+            self.__ft_write(cmd_data)
+            responses.append((self.__ft_read(rsp_size), layout))
+
+        out_data = []
+        for result, layout in responses:
+            for r, idx in layout:
+                #Throw an exception on a NACK. The stop has already been sent as
+                #part of the command stream, so the bus is left idle
+                if (result[idx] | result[idx + 1] | result[idx + 2]) & 0x1:
+                    nack_idx = [result[idx + i] & 0x1 for i in range(TXN_ACK_BYTES)].index(1)
+                    raise I2CNackError(r.bus_addr, r.reg_addr, nack_idx)
+                idx += TXN_ACK_BYTES
+                out_data.append(result[idx:idx + r.num_bytes])
+        return join_read_results(out_data, counts)
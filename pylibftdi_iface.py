@@ -0,0 +1,98 @@
+#
+# Interfaces class to for using FTDI2232 on Linux to talk to devices.
+# Uses the pylibftdi package (libftdi) to open the device for mpsse_i2c
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+from mpsse_iface import mpsse_i2c, FT_DEFAULT_I2C_CLOCK, FT_READ_TIMEOUT
+from time import monotonic
+
+#Number of MPSSE channels on each FT2232H. Bus numbers are assigned the same
+#way the D2XX driver enumerates them: two per device, channel A first
+FT2232H_CHANNELS = 2
+
+#Default time for a read call to wait for data, in ms
+PYLIBFTDI_READ_TIMEOUT_MS = 50
+
+
+class pylibftdi_device:
+    '''
+    Adapts a pylibftdi Device to the ftd2xx style methods used by mpsse_i2c.
+    Settings not exposed by pylibftdi directly are made through the underlying
+    libftdi calls.
+    '''
+    def __init__(self, dev):
+        '''
+        :param dev: Opened pylibftdi Device, in binary mode
+        '''
+        self.__dev = dev
+        self.__read_timeout = PYLIBFTDI_READ_TIMEOUT_MS / 1000.0
+
+    def __check(self, result, what):
+        if result < 0:
+            raise IOError('libftdi {} failed ({:d})'.format(what, result))
+
+    def write(self, data):
+        return self.__dev.write(data)
+
+    def read(self, nbytes):
+        #libftdi reads return whatever has arrived so far, where ftd2xx blocks
+        #until the request is complete (or times out). Keep reading until done
+        data = self.__dev.read(nbytes)
+        deadline = monotonic() + self.__read_timeout
+        while len(data) < nbytes and monotonic() < deadline:
+            data += self.__dev.read(nbytes - len(data))
+        return data
+
+    def setTimeouts(self, read_timeout, write_timeout):
+        #Writes are synchronous in libftdi, so only the read timeout applies
+        self.__read_timeout = read_timeout / 1000.0
+
+    def setLatencyTimer(self, latency):
+        self.__check(self.__dev.ftdi_fn.ftdi_set_latency_timer(latency), 'set latency timer')
+
+    def setUSBParameters(self, in_tx_size, out_tx_size = 0):
+        self.__check(self.__dev.ftdi_fn.ftdi_read_data_set_chunksize(in_tx_size), 'set read chunk size')
+        if out_tx_size:
+            self.__check(self.__dev.ftdi_fn.ftdi_write_data_set_chunksize(out_tx_size), 'set write chunk size')
+
+    def setBitMode(self, mask, enable):
+        self.__check(self.__dev.ftdi_fn.ftdi_set_bitmode(mask, enable), 'set bit mode')
+
+    def purge(self, mask = 0):
+        self.__dev.flush()
+
+    def close(self):
+        self.__dev.close()
+
+
+class pylibftdi_i2c(mpsse_i2c):
+    '''
+    FTDI wrapper for the I_I2C interface class, opening the device through
+    pylibftdi. This goes through libusb rather than the FTDI D2XX driver, so it
+    works on Linux hosts without any vendor drivers installed, but can't share
+    the device with the ADI provided GUI.
+
+    Bus numbers follow the D2XX enumeration: bus 0 is channel A of the first
+    FT2232H, bus 1 is channel B (the EvKit's I2C), bus 3 is channel B of the
+    second device and so on.
+    '''
+    def __init__(self, bus_num: int, batched: bool = True,
+                 clock_hz: int = FT_DEFAULT_I2C_CLOCK,
+                 read_timeout: float = FT_READ_TIMEOUT):
+        #Import the pylibftdi package here so it doesn't cause conflicts on
+        #systems without libftdi when this file is imported. Should only get
+        #touched if the class is initialized
+        global _pylibftdi
+        import pylibftdi as _pylibftdi
+        dev = _pylibftdi.Device(mode='b',
+                                interface_select=_pylibftdi.INTERFACE_A + (bus_num % FT2232H_CHANNELS),
+                                device_index=bus_num // FT2232H_CHANNELS)
+        super().__init__(pylibftdi_device(dev), batched, clock_hz, read_timeout)
@@ -11,31 +11,79 @@
 #
 # Author: Brent Kowal <brent.kowal@analog.com>
 #
-from i2c_iface import I_I2C
+from i2c_iface import I2C_ReadRequest, split_read_requests, join_read_results
+from i2cdev_iface import kernel_i2c, I2C_RDWR_MAX_MSGS
 from struct import unpack
 
-class smbus2_i2c(I_I2C):
+class smbus2_i2c(kernel_i2c):
     '''
-    smbus2 wrapper for the I_I2C interface class
+    smbus2 wrapper for the I_I2C interface class. Reads are made as combined
+    I2C_RDWR transactions (register address write, repeated start, data read)
+    rather than through the SMBus block read emulation, which is limited to
+    32 bytes per read. Batches of reads share ioctl calls.
     '''
+
     def __init__(self, bus_num: int):
         #Import the smbus2 package here so it doesn't cause conflicts on Windows
         #when this file is imported. Should only get touched if the class is
         #initialized
         global _smbus, _i2c_msg
-        from smbus2 import SMBus as _smbus
+        from smbus2 import SMBus as _smbus, i2c_msg as _i2c_msg
+        self.__bus_num = bus_num
         self.__bus = _smbus(bus_num)
 
+    def _reopen(self):
+        self.__bus.close()
+        self.__bus = _smbus(self.__bus_num)
+
+    def __read_msgs(self, bus_addr: int, reg_addr: int, num_bytes: int):
+        '''
+        Builds the message pair for reading from a register
+        :param bus_addr: Bus address of the device (8-bit)
+        :param reg_addr: Register address to start reading from
+        :param num_bytes: Number of bytes to read
+        :return: Tuple of the write and read i2c_msg
+        '''
+        return (_i2c_msg.write(bus_addr >> 1, [reg_addr]),
+                _i2c_msg.read(bus_addr >> 1, num_bytes))
+
+    def __read(self, bus_addr: int, reg_addr: int, num_bytes: int):
+        return self.i2c_read_batch([I2C_ReadRequest(bus_addr, reg_addr, num_bytes)])[0]
+
     def i2c_read_words(self, bus_addr:int , reg_addr: int, num_words: int):
-        rd = self.__bus.read_i2c_block_data(bus_addr >> 1, reg_addr, num_words * 2)
+        rd = self.__read(bus_addr, reg_addr, num_words * 2)
         #< for little endian, H for unsigned short
-        return unpack('<' + 'H'*num_words, bytes(rd))
+        return unpack('<' + 'H'*num_words, rd)
 
     def sbs_block_read(self, bus_addr: int, reg_addr: int, num_bytes: int):
-        rd = self.__bus.read_i2c_block_data(bus_addr >> 1, reg_addr, num_bytes)
-        return bytes(rd)
+        return self.__read(bus_addr, reg_addr, num_bytes)
 
     def sbs_word_read(self, bus_addr: int, reg_addr: int):
-        rd = self.__bus.read_i2c_block_data(bus_addr >> 1, reg_addr, 2)
+        rd = self.__read(bus_addr, reg_addr, 2)
         #< for little endian, H for unsigned short
-        return unpack('<' + 'H', bytes(rd))[0]
+        return unpack('<' + 'H', rd)[0]
+
+    def _read_one(self, request: I2C_ReadRequest):
+        self.__bus.i2c_rdwr(*self.__read_msgs(request.bus_addr, request.reg_addr,
+                                              request.num_bytes))
+
+    def i2c_read_batch(self, requests):
+        #Pack as many reads as the kernel allows into each ioctl. Each read
+        #after the first starts with a repeated start, with a single stop at
+        #the end of the call
+        requests, counts = split_read_requests(requests, self.MAX_READ_BYTES)
+        per_call = I2C_RDWR_MAX_MSGS // 2
+        results = []
+        for i in range(0, len(requests), per_call):
+            msgs = []
+            for r in requests[i:i + per_call]:
+                msgs.extend(self.__read_msgs(r.bus_addr, r.reg_addr, r.num_bytes))
+            try:
+                self.__bus.i2c_rdwr(*msgs)
+            except OSError as ex:
+                nack = self._nack_error(requests[i:i + per_call], ex)
+                if nack is None:
+                    raise
+                raise nack from ex
+            results.extend(bytes(rd) for rd in msgs[1::2])
+        return join_read_results(results, counts)
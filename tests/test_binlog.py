@@ -0,0 +1,101 @@
+#
+# Round trip checks of the binary log format, writing with binary_log_writer
+# and reading back with max1730x_reader.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+import max1730x_regs
+from max1730x_binlog import binary_log_writer, read_header
+from max1730x_plan import select_registers, UNSUPPORTED
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy
+    from max1730x_reader import log_reader
+except ImportError:
+    numpy = None
+
+#In register map order, which is the order select_registers() returns
+COLUMNS = ['RepSOC_006', 'VCell_01A', 'sManfctName_120', 'sTemp1_134']
+
+#Rows of values in COLUMNS order, with NA cells: not yet read (None) and
+#unsupported SBS registers
+ROWS = [(1700000000000000000, [0x1234, None, b'\x04MAXI', 0x0BB8]),
+        (1700000001000000000, [0x1235, 0xABCD, None, UNSUPPORTED]),
+        (1700000002000000000, [None, 0xFFFF, b'\x02AB', 0x0000])]
+
+
+@unittest.skipIf(numpy is None, 'numpy is needed to read logs back')
+class test_binlog(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'log.bin')
+
+    def write_log(self, schema_hash = None):
+        registers, sbs_registers = select_registers(COLUMNS)
+        with open(self.path, 'wb') as f:
+            writer = binary_log_writer(f, registers, sbs_registers, {'interface' : 'test'}, 1.0)
+            if schema_hash is not None:
+                writer.header['schema_hash'] = schema_hash
+            writer.write_header()
+            for timestamp_ns, values in ROWS:
+                writer.write_row(timestamp_ns, values)
+
+    def test_round_trip(self):
+        self.write_log()
+        log = log_reader(self.path)
+        self.assertEqual(log.columns, COLUMNS)
+        self.assertEqual(len(log), len(ROWS))
+        self.assertEqual(log.header['device'], {'interface' : 'test'})
+        self.assertEqual(list(log.timestamps()), [t for t, _ in ROWS])
+
+        for col, name in enumerate(COLUMNS):
+            valid = log.valid(name)
+            for rec, (_, values) in enumerate(ROWS):
+                value = values[col]
+                expect_valid = (value is not None) and (value != UNSUPPORTED)
+                self.assertEqual(bool(valid[rec]), expect_valid, (name, rec))
+                if expect_valid:
+                    self.assertEqual(log.column(name)[rec], value)
+                else:
+                    #Values which weren't read are written as zeros
+                    self.assertFalse(log.column(name)[rec])
+
+    def test_record_size(self):
+        #Timestamp, 3 words, a 5 byte block and a byte of validity bits, with
+        #the records straight after the 8 byte aligned header
+        self.write_log()
+        with open(self.path, 'rb') as f:
+            header, offset = read_header(f)
+        self.assertEqual(header['record_size'], 8 + 3 * 2 + 5 + 1)
+        self.assertEqual(offset % 8, 0)
+        self.assertEqual(os.path.getsize(self.path), offset + len(ROWS) * header['record_size'])
+
+    def test_schema_mismatch(self):
+        self.write_log(schema_hash = '0' * 16)
+        with self.assertRaises(ValueError):
+            log_reader(self.path)
+        with open(self.path, 'rb') as f:
+            header, _ = read_header(f, check_schema = False)
+        self.assertNotEqual(header['schema_hash'], max1730x_regs.REGISTER_DB.schema_hash)
+
+    def test_not_a_log(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'Timestamp,RepSOC_006\n')
+        with open(self.path, 'rb') as f:
+            with self.assertRaises(ValueError):
+                read_header(f)
+
+
+if __name__ == '__main__':
+    unittest.main()
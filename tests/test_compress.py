@@ -0,0 +1,113 @@
+#
+# Checks of the block compressed log output: that gz, xz and bz2 logs written a
+# block at a time read back whole, and that what's on the disk before the file
+# is closed reads back up to the last full block.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+from max1730x_compress import block_compressed_file, open_compressed, open_output, \
+                              compress_method, COMPRESS_METHODS, COMPRESS_MODULES
+import os
+import shutil
+import tempfile
+import unittest
+
+BLOCK_SIZE = 256
+
+#Written 100 bytes at a time, so a block goes out on every third write
+WRITE_SIZE = 100
+DATA = bytes((n * 7) & 0xFF for n in range(2000))
+
+
+class test_block_compressed_file(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def path(self, method: str, name: str = 'log.bin'):
+        return os.path.join(self.dir, name + '.' + method)
+
+    def read_back(self, path: str):
+        with open_compressed(path, 'rb') as f:
+            return f.read()
+
+    def test_multi_block(self):
+        for method in COMPRESS_METHODS:
+            with self.subTest(method = method):
+                path = self.path(method)
+                f = block_compressed_file(path, method, BLOCK_SIZE)
+                for pos in range(0, len(DATA), WRITE_SIZE):
+                    self.assertEqual(f.write(DATA[pos:pos + WRITE_SIZE]), WRITE_SIZE)
+                self.assertEqual(f.blocks, 6)
+                f.close()
+                #The last 200 bytes go out as a shorter block on closing
+                self.assertEqual(f.blocks, 7)
+                self.assertEqual(self.read_back(path), DATA)
+
+                #Each block is a stream of its own, so the file is longer
+                #than compressing it all at once would make it
+                self.assertGreater(os.path.getsize(path),
+                                   len(COMPRESS_MODULES[method].compress(DATA)))
+
+    def test_truncated(self):
+        #What's on the disk before closing is as if the logger had stopped
+        #there, and reads back as every full block, without the data still
+        #being gathered
+        for method in COMPRESS_METHODS:
+            with self.subTest(method = method):
+                path = self.path(method)
+                with block_compressed_file(path, method, BLOCK_SIZE) as f:
+                    for pos in range(0, 1000, WRITE_SIZE):
+                        f.write(DATA[pos:pos + WRITE_SIZE])
+                    self.assertEqual(f.blocks, 3)
+                    crashed = self.path(method, 'crashed.bin')
+                    shutil.copyfile(path, crashed)
+                self.assertEqual(self.read_back(crashed), DATA[:900])
+                self.assertEqual(self.read_back(path), DATA[:1000])
+
+    def test_close(self):
+        #Closing with nothing gathered writes no empty block, and closing
+        #again does nothing
+        path = self.path('gz')
+        f = block_compressed_file(path, 'gz', BLOCK_SIZE)
+        f.write(DATA[:BLOCK_SIZE])
+        f.close()
+        f.close()
+        self.assertEqual(f.blocks, 1)
+        self.assertEqual(self.read_back(path), DATA[:BLOCK_SIZE])
+
+        path = self.path('xz', 'empty.bin')
+        f = block_compressed_file(path, 'xz', BLOCK_SIZE)
+        f.close()
+        self.assertEqual(f.blocks, 0)
+        self.assertEqual(os.path.getsize(path), 0)
+
+    def test_bad_method(self):
+        with self.assertRaises(ValueError):
+            block_compressed_file(self.path('zip'), 'zip')
+
+    def test_text_output(self):
+        #Text goes straight through to the blocks, rather than waiting in the
+        #text layer until it's closed
+        lines = ['{:d},{:04X}\r\n'.format(n, n * 3) for n in range(200)]
+        for method in COMPRESS_METHODS:
+            with self.subTest(method = method):
+                path = self.path(method, 'log.csv')
+                self.assertEqual(compress_method(path), method)
+                with open_output(path, False, method, BLOCK_SIZE) as f:
+                    f.writelines(lines)
+                    self.assertGreater(os.path.getsize(path), 0)
+                with open_compressed(path, 'rt') as f:
+                    self.assertEqual(f.read(), ''.join(lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
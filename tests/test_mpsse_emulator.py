@@ -0,0 +1,115 @@
+#
+# Checks of the FTDI MPSSE I2C interface, run against the emulator so no
+# hardware is needed.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+import max1730x_regs
+from ftdi_emulator import mpsse_emulator
+from mpsse_iface import mpsse_i2c, RECOVERY_CLOCKS
+from i2c_iface import I2C_ReadRequest, I2CNackError, I2C_MIN_CLOCK, I2C_MAX_CLOCK
+from struct import unpack
+import unittest
+
+M5 = max1730x_regs.M5_DEV_ADDR
+SBS = max1730x_regs.SBS_NV_DEV_ADDR
+
+#A mix of word reads, a long read spanning several registers, and an SBS block
+REQUESTS = [I2C_ReadRequest(M5, 0x00, 2),
+            I2C_ReadRequest(M5, 0x10, 0x20),
+            I2C_ReadRequest(M5, 0xB0, 0x100),
+            I2C_ReadRequest(SBS, 0x20, 5),
+            I2C_ReadRequest(SBS, 0x1C, 6)]
+
+
+class test_mpsse_emulator(unittest.TestCase):
+    def make_iface(self, batched = True, **kwargs):
+        emu = mpsse_emulator(**kwargs)
+        return emu, mpsse_i2c(emu, batched)
+
+    def test_stale_rx_at_open(self):
+        #Responses left queued by whoever had the device before
+        emu = mpsse_emulator()
+        emu.write(bytes([0x81, 0x81, 0x81]))
+        iface = mpsse_i2c(emu)
+        self.assertEqual(iface.sbs_word_read(M5, 0x00), emu.target.regs[0x00])
+
+    def test_batched_matches_per_byte(self):
+        _, batched = self.make_iface(True)
+        _, per_byte = self.make_iface(False)
+        self.assertEqual(batched.i2c_read_batch(REQUESTS), per_byte.i2c_read_batch(REQUESTS))
+
+    def test_read_values(self):
+        emu, iface = self.make_iface()
+        words = iface.i2c_read_words(M5, 0x10, 4)
+        self.assertEqual(list(words), [emu.target.regs[0x10 + i] for i in range(4)])
+        self.assertEqual(iface.sbs_block_read(SBS, 0x20, 5), emu.target.blocks[0x120])
+
+    def test_set_clock(self):
+        for batched in (True, False):
+            for clock_hz in (100000, 400000):
+                emu, iface = self.make_iface(batched)
+                actual = iface.set_clock(clock_hz)
+                #The register read makes sure the MPSSE has run the command
+                iface.sbs_word_read(M5, 0x00)
+                self.assertEqual(actual, emu.clock_hz)
+                self.assertEqual(iface.get_clock(), emu.clock_hz)
+                self.assertLessEqual(actual, clock_hz)
+
+    def test_set_clock_range(self):
+        emu, iface = self.make_iface()
+        for clock_hz in (I2C_MIN_CLOCK - 1, I2C_MAX_CLOCK + 1, 1000000):
+            with self.assertRaises(ValueError):
+                iface.set_clock(clock_hz)
+        self.assertLessEqual(iface.set_clock(I2C_MIN_CLOCK), I2C_MIN_CLOCK)
+
+    def test_nack_byte_index(self):
+        for batched in (True, False):
+            #0x170 is NACK'd by default, on the register address
+            emu, iface = self.make_iface(batched)
+            with self.assertRaises(I2CNackError) as ctx:
+                iface.sbs_word_read(SBS, 0x70)
+            self.assertEqual((ctx.exception.bus_addr, ctx.exception.reg_addr,
+                              ctx.exception.byte_index), (SBS, 0x70, 1))
+
+            #No device at the address, NACK'd on the device address
+            del emu.target.dev_bases[SBS]
+            with self.assertRaises(I2CNackError) as ctx:
+                iface.i2c_read_batch([I2C_ReadRequest(M5, 0x00, 2),
+                                      I2C_ReadRequest(SBS, 0x20, 5)])
+            self.assertEqual((ctx.exception.bus_addr, ctx.exception.byte_index), (SBS, 0))
+
+            #Nothing was left behind to upset the next read
+            self.assertEqual(iface.sbs_word_read(M5, 0x00), emu.target.regs[0x00])
+
+    def test_short_reads(self):
+        _, reference = self.make_iface()
+        expected = reference.i2c_read_batch(REQUESTS)
+        _, iface = self.make_iface(max_read_chunk = 7)
+        self.assertEqual(iface.i2c_read_batch(REQUESTS), expected)
+        self.assertGreater(iface.get_stats()['Short Reads'], 0)
+        self.assertEqual(iface.get_stats()['Read Timeouts'], 0)
+
+    def test_recover_bus(self):
+        emu, iface = self.make_iface()
+        emu.target.hold_sda_low(RECOVERY_CLOCKS - 2)
+        self.assertTrue(iface.recover_bus())
+        self.assertEqual(emu.target.stuck_clocks, 0)
+        self.assertEqual(unpack('<H', iface.sbs_block_read(M5, 0x00, 2))[0], emu.target.regs[0x00])
+
+    def test_recover_bus_stuck(self):
+        emu, iface = self.make_iface()
+        emu.target.hold_sda_low(RECOVERY_CLOCKS + 10)
+        self.assertFalse(iface.recover_bus())
+        self.assertGreater(emu.target.stuck_clocks, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
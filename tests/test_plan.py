@@ -0,0 +1,97 @@
+#
+# Checks of the read plan compiler: how registers are gathered into reads, and
+# that the decoded values match reading each register on its own.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+import max1730x_regs
+from max1730x_plan import read_plan, select_registers, PlanRun
+from ftdi_emulator import emulator_i2c
+from i2c_iface import I2C_ReadRequest
+import unittest
+
+M5 = max1730x_regs.M5_DEV_ADDR
+SBS = max1730x_regs.SBS_NV_DEV_ADDR
+
+
+def plan_of(addrs: list, max_read_bytes: int = 64, txn_overhead_bytes: int = 8):
+    '''
+    Builds a plan of just page registers, given by address
+    '''
+    registers, _ = select_registers(addrs)
+    return read_plan(registers, [], max_read_bytes, txn_overhead_bytes)
+
+
+class test_read_plan(unittest.TestCase):
+    def test_consecutive_merge(self):
+        plan = plan_of([0x005, 0x006, 0x007])
+        self.assertEqual(plan.runs, [PlanRun(M5, 0x005, 0x007)])
+        self.assertEqual(plan.requests, [I2C_ReadRequest(M5, 0x05, 6)])
+
+    def test_gap_against_overhead(self):
+        #An overhead of 8 bytes makes a gap of up to 4 registers worth reading
+        #over, rather than starting another read
+        plan = plan_of([0x000, 0x005], txn_overhead_bytes = 8)
+        self.assertEqual(plan.runs, [PlanRun(M5, 0x000, 0x005)])
+        plan = plan_of([0x000, 0x006], txn_overhead_bytes = 8)
+        self.assertEqual(plan.runs, [PlanRun(M5, 0x000, 0x000), PlanRun(M5, 0x006, 0x006)])
+
+        #Reserved registers are read over just the same (0x024-0x026)
+        plan = plan_of([0x023, 0x027], txn_overhead_bytes = 6)
+        self.assertEqual(plan.runs, [PlanRun(M5, 0x023, 0x027)])
+
+    def test_gap_not_readable(self):
+        #0x050-0x09F aren't in the register map, so are never read over,
+        #however cheap it would be. A gap of readable pages is
+        plan = plan_of([0x04D, 0x0A0], max_read_bytes = 1024, txn_overhead_bytes = 400)
+        self.assertEqual(plan.runs, [PlanRun(M5, 0x04D, 0x04D), PlanRun(M5, 0x0A0, 0x0A0)])
+        plan = plan_of([0x000, 0x04D], max_read_bytes = 1024, txn_overhead_bytes = 400)
+        self.assertEqual(plan.runs, [PlanRun(M5, 0x000, 0x04D)])
+
+    def test_max_read_bytes(self):
+        #8 bytes per read is 4 registers
+        plan = plan_of(list(range(0x000, 0x010)), max_read_bytes = 8)
+        self.assertEqual(plan.runs, [PlanRun(M5, first, first + 3) for first in range(0, 16, 4)])
+        self.assertTrue(all(r.num_bytes <= 8 for r in plan.requests))
+
+    def test_devices_not_merged(self):
+        #0x0F0 and 0x180 are on different bus addresses
+        plan = plan_of([0x0FF, 0x180], max_read_bytes = 1024, txn_overhead_bytes = 1024)
+        self.assertEqual([(r.dev_addr, r.first_addr) for r in plan.runs], [(M5, 0x0FF), (SBS, 0x180)])
+
+    def test_columns_in_selection_order(self):
+        #Columns follow the register order given, whatever order the reads
+        #are made in
+        registers, sbs = select_registers(['RepSOC', 'Status', 'sCurrent'])
+        plan = read_plan(list(reversed(registers)), sbs)
+        self.assertEqual(plan.columns, ['RepSOC_006', 'Status_000', 'sCurrent_10A'])
+        self.assertEqual(plan.runs, [PlanRun(M5, 0x000, 0x000), PlanRun(M5, 0x006, 0x006)])
+
+    def test_decode_matches_single_reads(self):
+        iface = emulator_i2c(0)
+        for keep_rsvd in (False, True):
+            registers, sbs_registers = select_registers(None, keep_rsvd)
+            plan = read_plan(registers, sbs_registers, iface.MAX_READ_BYTES,
+                             iface.TXN_OVERHEAD_BYTES)
+            values = plan.decode(iface.i2c_read_batch(plan.requests))
+            self.assertEqual(len(values), len(plan.columns))
+
+            expected = [iface.i2c_read_words(r.dev_addr, r.addr & 0xFF, 1)[0] for r in registers]
+            for sbs in sbs_registers:
+                if sbs.block_size > 0:
+                    rd = iface.sbs_block_read(sbs.dev_addr, sbs.base_addr & 0xFF, sbs.block_size)
+                    expected.append(rd[:1 + rd[0]])
+                else:
+                    expected.append(iface.sbs_word_read(sbs.dev_addr, sbs.base_addr & 0xFF))
+            self.assertEqual(values, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+#
+# Checks of reading logs back: the memory mapped records, time slicing, and
+# the binary cache made of CSV and compressed logs.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+from max1730x_binlog import binary_log_writer
+from max1730x_compress import open_output, COMPRESS_METHODS
+from max1730x_logger import format_row
+from max1730x_plan import select_registers, UNSUPPORTED
+import csv
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy
+    from max1730x_reader import log_reader, seconds_to_ns, LOG_CACHE_EXT
+except ImportError:
+    numpy = None
+
+#In register map order, which is the order select_registers() returns
+COLUMNS = ['RepSOC_006', 'VCell_01A', 'sManfctName_120', 'sTemp1_134']
+
+#Records are 250ms apart from START_NS, so they survive the CSV's ms timestamps
+START_NS = 1700000000 * 1000000000
+STEP_NS = 250000000
+
+
+def make_rows(count: int):
+    '''
+    Makes rows of (timestamp, values), with a few values missing
+    '''
+    rows = []
+    for n in range(count):
+        values = [0x1000 + n, 0xD000 - n, b'\x04MAXI', 0x0B00 + n]
+        if n == 0:
+            values[1] = None
+        if n % 3 == 1:
+            values[3] = UNSUPPORTED
+        rows.append((START_NS + n * STEP_NS, values))
+    return rows
+
+
+def seconds(n: int):
+    '''
+    Gets the timestamp of record n, in seconds
+    '''
+    return (START_NS + n * STEP_NS) / 1e9
+
+
+@unittest.skipIf(numpy is None, 'numpy is needed to read logs back')
+class test_log_reader(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def write_bin(self, name: str, rows: list, method: str = None):
+        path = os.path.join(self.dir, name)
+        registers, sbs_registers = select_registers(COLUMNS)
+        with open_output(path, True, method, block_size = 64) as f:
+            writer = binary_log_writer(f, registers, sbs_registers)
+            writer.write_header()
+            for timestamp_ns, values in rows:
+                writer.write_row(timestamp_ns, values)
+        return path
+
+    def write_csv(self, name: str, rows: list, method: str = None):
+        path = os.path.join(self.dir, name)
+        with open_output(path, False, method, block_size = 64) as f:
+            csv_wr = csv.writer(f)
+            csv_wr.writerow(['Timestamp'] + COLUMNS)
+            for row in rows:
+                csv_wr.writerow(format_row(*row, True))
+        return path
+
+    def check_records(self, log, rows: list):
+        '''
+        Checks a log reads back as the rows written to it
+        '''
+        self.assertEqual(log.columns, COLUMNS)
+        self.assertEqual(list(log.timestamps()), [t for t, _ in rows])
+        for col, name in enumerate(COLUMNS):
+            values = [v[col] for _, v in rows]
+            valid = [(v is not None) and (v != UNSUPPORTED) for v in values]
+            self.assertEqual(list(log.valid(name)), valid, name)
+            self.assertEqual([v for v, ok in zip(log.column(name).tolist(), valid) if ok],
+                             [v for v, ok in zip(values, valid) if ok], name)
+
+    def test_memmap(self):
+        rows = make_rows(10)
+        path = self.write_bin('log.bin', rows)
+        log = log_reader(path)
+        self.assertIsInstance(log.records, numpy.memmap)
+        self.assertEqual(log.path, path)
+        self.assertEqual(len(log), 10)
+        self.check_records(log, rows)
+        self.assertFalse(os.path.exists(path + LOG_CACHE_EXT))
+
+        #Part of a record, as the logger is still writing, is left out
+        with open(path, 'ab') as f:
+            f.write(b'\x00' * (log.dtype.itemsize // 2))
+        self.assertEqual(len(log_reader(path)), 10)
+
+    def test_empty(self):
+        log = log_reader(self.write_bin('log.bin', []))
+        self.assertEqual(len(log), 0)
+        self.assertEqual(len(log.time_slice(seconds(0), seconds(1))), 0)
+
+    def test_time_slice(self):
+        log = log_reader(self.write_bin('log.bin', make_rows(10)))
+        def span(start, end):
+            stamps = log.time_slice(start, end)['Timestamp']
+            return [(t - START_NS) // STEP_NS for t in stamps.tolist()]
+
+        self.assertEqual(span(None, None), list(range(10)))
+        #Start is inclusive and end exclusive, on a record's exact timestamp
+        self.assertEqual(span(seconds(2), seconds(5)), [2, 3, 4])
+        self.assertEqual(span(seconds(2), seconds(3)), [2])
+        self.assertEqual(span(seconds(2), seconds(2)), [])
+        #Between records
+        self.assertEqual(span(seconds(2) + 0.1, seconds(5) - 0.1), [3, 4])
+        self.assertEqual(span(None, seconds(3)), [0, 1, 2])
+        self.assertEqual(span(seconds(7), None), [7, 8, 9])
+        #Outside of the log
+        self.assertEqual(span(seconds(-5), seconds(1)), [0])
+        self.assertEqual(span(seconds(9), seconds(20)), [9])
+        self.assertEqual(span(seconds(10), None), [])
+        self.assertEqual(span(None, seconds(0)), [])
+        self.assertEqual(span(seconds(5), seconds(2)), [])
+
+        #The slice is a view of the file, not a copy
+        self.assertTrue(numpy.shares_memory(log.time_slice(seconds(2), seconds(5)), log.records))
+        self.assertEqual(list(log.valid('sTemp1_134', log.time_slice(seconds(3), seconds(6)))),
+                         [True, False, True])
+
+    def test_csv_cache(self):
+        rows = make_rows(10)
+        path = self.write_csv('log.csv', rows)
+        log = log_reader(path)
+        self.assertEqual(log.path, path + LOG_CACHE_EXT)
+        self.assertTrue(os.path.exists(log.path))
+        self.assertEqual(log.header['device'], {'converted_from' : 'log.csv'})
+        self.check_records(log, rows)
+
+    def test_compressed(self):
+        #Compressed CSV and binary logs are both cached as binary logs, each
+        #written over several compressed blocks
+        rows = make_rows(20)
+        for method in COMPRESS_METHODS:
+            for name, write in (('log.csv', self.write_csv), ('log.bin', self.write_bin)):
+                with self.subTest(name = name, method = method):
+                    path = write(name + '.' + method, rows, method)
+                    log = log_reader(path)
+                    self.assertEqual(log.path, path + LOG_CACHE_EXT)
+                    self.check_records(log, rows)
+
+    def test_cache_reuse(self):
+        path = self.write_csv('log.csv.gz', make_rows(5), 'gz')
+        cache_path = log_reader(path).path
+
+        #A cache newer than the log is used as is
+        newer = os.path.getmtime(path) + 10
+        os.utime(cache_path, (newer, newer))
+        self.assertEqual(len(log_reader(path)), 5)
+        self.assertEqual(os.path.getmtime(cache_path), newer)
+
+        #Once the log is newer than the cache, it's converted again
+        self.write_csv('log.csv.gz', make_rows(8), 'gz')
+        os.utime(path, (newer + 10, newer + 10))
+        self.assertEqual(len(log_reader(path)), 8)
+        self.assertNotEqual(os.path.getmtime(cache_path), newer)
+
+    def test_seconds_to_ns(self):
+        self.assertEqual(seconds_to_ns(1700000000.75), 1700000000750000000)
+        self.assertEqual(seconds_to_ns(float('1700000000.100')), 1700000000100000000)
+        self.assertEqual(seconds_to_ns(0.000001), 1000)
+        self.assertEqual(seconds_to_ns(-0.5), -500000000)
+
+    def test_cache_from_other_map(self):
+        #A CSV column not in the register map can't be converted
+        path = os.path.join(self.dir, 'log.csv')
+        with open(path, 'w', newline = '') as f:
+            f.write('Timestamp,RepSOC_006,NotARegister_999\n1700000000,0000,0000\n')
+        with self.assertRaises(ValueError):
+            log_reader(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#
+# Checks of the logging tick scheduler, against a simulated clock so they run
+# instantly and the timings are exact.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+import max1730x_sched
+from max1730x_sched import tick_scheduler, SCHED_SKIP, SCHED_CATCH_UP
+from unittest import mock
+import unittest
+
+MS = 1000000
+
+
+class fake_clock:
+    '''
+    Stands in for the time module. The monotonic clock only moves when slept
+    on, or when the test does work
+    '''
+    def __init__(self):
+        self.now_ns = 1000 * MS
+
+    def monotonic_ns(self):
+        return self.now_ns
+
+    def sleep(self, seconds):
+        self.now_ns += max(1, round(seconds * 1e9))
+
+    def work(self, ms):
+        self.now_ns += ms * MS
+
+
+class test_sched(unittest.TestCase):
+    def setUp(self):
+        self.clock = fake_clock()
+        patcher = mock.patch.object(max1730x_sched, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_ticks(self, sched, work_ms):
+        '''
+        Runs a tick for each entry of work_ms, doing that much work after it
+        :return: List of the start time of each tick, in ms, and the list of
+                 wait() return values
+        '''
+        starts = []
+        late = []
+        for ms in work_ms:
+            late.append(sched.wait())
+            starts.append(self.clock.now_ns // MS)
+            self.clock.work(ms)
+        return starts, late
+
+    def test_on_time(self):
+        sched = tick_scheduler(0.1)
+        starts, late = self.run_ticks(sched, [30] * 5)
+        self.assertEqual(starts, [1000, 1100, 1200, 1300, 1400])
+        self.assertEqual(late, [0] * 5)
+        self.assertEqual(sched.missed, 0)
+        self.assertEqual(sched.jitter_stats(), (0.0, 0.0))
+
+    def test_skip(self):
+        #The second tick runs until 1350, so the tick at 1200 is missed, the
+        #one at 1300 runs late, and it carries on at 1400 on the original grid
+        sched = tick_scheduler(0.1, SCHED_SKIP)
+        starts, late = self.run_ticks(sched, [10, 250, 10, 10])
+        self.assertEqual(starts, [1000, 1100, 1350, 1400])
+        self.assertEqual(late, [0, 0, 1, 0])
+        self.assertEqual(sched.missed, 1)
+        self.assertEqual(sched.ticks, 4)
+
+    def test_catch_up(self):
+        #Same overrun, but the missed ticks run back to back until the
+        #schedule is caught up. None are skipped, the lateness is returned
+        sched = tick_scheduler(0.1, SCHED_CATCH_UP)
+        starts, late = self.run_ticks(sched, [10, 250, 10, 10, 10, 10])
+        self.assertEqual(starts, [1000, 1100, 1350, 1360, 1400, 1500])
+        self.assertEqual(late, [0, 0, 1, 0, 0, 0])
+        self.assertEqual(sched.missed, 0)
+        self.assertEqual(sched.jitter_stats()[1], 0.15)
+
+    def test_free_running(self):
+        #An interval of 0 never waits, and nothing counts as missed
+        for policy in max1730x_sched.SCHED_POLICIES:
+            sched = tick_scheduler(0, policy)
+            first = self.clock.now_ns // MS
+            starts, late = self.run_ticks(sched, [1] * 1000)
+            self.assertTrue(starts == list(range(first, first + 1000)))
+            self.assertEqual(sum(late), 0)
+            self.assertEqual(sched.missed, 0)
+            self.assertEqual(sched.ticks, 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#
+# Checks of the polling tiers' handling of SBS registers the device NACKs,
+# run against the emulator.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+import max1730x_regs
+from max1730x_plan import tiered_plan, select_registers, UNSUPPORTED
+from ftdi_emulator import mpsse_emulator
+from mpsse_iface import mpsse_i2c
+from i2c_iface import I2CNackError
+import unittest
+
+#sTemp1, which the emulated device is made to NACK
+NACK_REG = 0x134
+NACK_COLUMN = 2
+
+
+class unplaced_nack_i2c:
+    '''
+    Passes reads through, but reports NACKs without saying which byte, as the
+    kernel interfaces do
+    '''
+    def __init__(self, iface):
+        self.iface = iface
+
+    def i2c_read_batch(self, requests):
+        try:
+            return self.iface.i2c_read_batch(requests)
+        except I2CNackError as ex:
+            raise I2CNackError(ex.bus_addr, ex.reg_addr, None) from ex
+
+
+class test_tiered_plan_nack(unittest.TestCase):
+    def setUp(self):
+        self.emu = mpsse_emulator()
+        self.emu.target.nack_regs.add(NACK_REG)
+        self.iface = mpsse_i2c(self.emu)
+        registers, sbs_registers = select_registers(['RepSOC', 'VCell', 'sTemp1', 'sIntTemp'])
+        self.plan = tiered_plan(registers, sbs_registers)
+        self.sbs = sbs_registers[0]
+
+    def test_register_nack(self):
+        #The interface says the register address was NACK'd, so it's dropped
+        #straight away and the rest of the poll still happens
+        values = self.plan.poll(self.iface, 0)
+        self.assertEqual(values[NACK_COLUMN], UNSUPPORTED)
+        self.assertEqual(values[3], self.emu.target.regs[0x135])
+        self.assertEqual(self.plan.unsupported, {self.sbs})
+
+        #And it isn't read again
+        self.emu.target.nack_regs.clear()
+        self.assertEqual(self.plan.poll(self.iface, 1)[NACK_COLUMN], UNSUPPORTED)
+
+    def test_unplaced_nack_twice(self):
+        #Without the byte, the first NACK is passed on and only the second in
+        #a row drops the register
+        iface = unplaced_nack_i2c(self.iface)
+        with self.assertRaises(I2CNackError):
+            self.plan.poll(iface, 0)
+        self.assertEqual(self.plan.unsupported, set())
+        self.assertIsNone(self.plan.values[NACK_COLUMN])
+
+        values = self.plan.poll(iface, 1)
+        self.assertEqual(values[NACK_COLUMN], UNSUPPORTED)
+        self.assertEqual(self.plan.unsupported, {self.sbs})
+
+    def test_unplaced_nack_once(self):
+        #A one-off NACK, then a good read, leaves the register in. Another
+        #NACK after that starts over
+        iface = unplaced_nack_i2c(self.iface)
+        with self.assertRaises(I2CNackError):
+            self.plan.poll(iface, 0)
+        self.emu.target.nack_regs.clear()
+        values = self.plan.poll(iface, 1)
+        self.assertEqual(values[NACK_COLUMN], self.emu.target.regs[NACK_REG])
+
+        self.emu.target.nack_regs.add(NACK_REG)
+        with self.assertRaises(I2CNackError):
+            self.plan.poll(iface, 2)
+        self.assertEqual(self.plan.unsupported, set())
+
+    def test_device_nack(self):
+        #A device which doesn't answer at all is an error every time, and
+        #never drops any of its registers
+        del self.emu.target.dev_bases[max1730x_regs.SBS_NV_DEV_ADDR]
+        for now in range(3):
+            with self.assertRaises(I2CNackError) as ctx:
+                self.plan.poll(self.iface, now)
+            self.assertEqual(ctx.exception.byte_index, 0)
+        self.assertEqual(self.plan.unsupported, set())
+        self.assertNotIn(UNSUPPORTED, self.plan.values)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+#
+# Checks of the log writer thread's backpressure policies and error handling,
+# using a sink which only writes when the test lets it.
+#
+# Copyright © 2025 by Analog Devices, Inc.  All rights reserved.
+# This software is proprietary to Analog Devices, Inc. and its licensors.
+# This software is provided on an “as is” basis without any representations,
+# warranties, guarantees or liability of any kind.
+# Use of the software is subject to the terms and conditions of the
+# Clear BSD License ( https://spdx.org/licenses/BSD-3-Clause-Clear.html ).
+#
+# Author: Brent Kowal <brent.kowal@analog.com>
+#
+from max1730x_writer import log_writer, LogWriterError, BACKPRESSURE_BLOCK, \
+                            BACKPRESSURE_DROP_OLDEST, BACKPRESSURE_DROP_NEWEST
+import threading
+import unittest
+
+#Longest wait on the writer thread before a test fails, in seconds
+WAIT_TIMEOUT = 5.0
+
+
+class slow_sink:
+    '''
+    Write function which holds each row until released, to stand in for an
+    output which can't keep up
+    '''
+    def __init__(self, fail_on = None):
+        '''
+        :param fail_on: Row to raise an error on, rather than writing it
+        '''
+        self.rows = []
+        self.fail_on = fail_on
+        self.writing = threading.Event()
+        self.__release = threading.Semaphore(0)
+
+    def __call__(self, row):
+        self.writing.set()
+        if not self.__release.acquire(timeout = WAIT_TIMEOUT):
+            raise RuntimeError('Row never released')
+        if row == self.fail_on:
+            raise OSError('disk full')
+        self.rows.append(row)
+
+    def release(self, count = 1):
+        for _ in range(count):
+            self.__release.release()
+
+
+class test_log_writer(unittest.TestCase):
+    def start(self, backpressure, queue_size = 2, fail_on = None):
+        '''
+        Starts a writer, and waits for it to be holding the first row, so the
+        queue itself is empty
+        '''
+        sink = slow_sink(fail_on)
+        writer = log_writer(sink, queue_size, backpressure)
+        writer.put(0)
+        self.assertTrue(sink.writing.wait(WAIT_TIMEOUT))
+        return sink, writer
+
+    def finish(self, sink, writer, rows):
+        sink.release(rows)
+        writer.close()
+
+    def test_block(self):
+        sink, writer = self.start(BACKPRESSURE_BLOCK)
+        self.assertTrue(writer.put(1))
+        self.assertTrue(writer.put(2))
+        self.assertEqual(writer.depth(), 2)
+
+        #The queue is full, so the next put waits until a row is written
+        putter = threading.Thread(target = writer.put, args = (3,))
+        putter.start()
+        putter.join(0.1)
+        self.assertTrue(putter.is_alive())
+        sink.release()
+        putter.join(WAIT_TIMEOUT)
+        self.assertFalse(putter.is_alive())
+
+        self.finish(sink, writer, 3)
+        self.assertEqual(sink.rows, [0, 1, 2, 3])
+        self.assertEqual((writer.written, writer.dropped, writer.max_depth), (4, 0, 2))
+
+    def test_drop_oldest(self):
+        sink, writer = self.start(BACKPRESSURE_DROP_OLDEST)
+        for row in range(1, 6):
+            self.assertTrue(writer.put(row))
+        self.assertEqual(writer.depth(), 2)
+        self.finish(sink, writer, 3)
+        self.assertEqual(sink.rows, [0, 4, 5])
+        self.assertEqual((writer.written, writer.dropped), (3, 3))
+
+    def test_drop_newest(self):
+        sink, writer = self.start(BACKPRESSURE_DROP_NEWEST)
+        self.assertEqual([writer.put(row) for row in range(1, 6)],
+                         [True, True, False, False, False])
+        self.finish(sink, writer, 3)
+        self.assertEqual(sink.rows, [0, 1, 2])
+        self.assertEqual((writer.written, writer.dropped), (3, 3))
+
+    def test_error(self):
+        #The writer stops on the error, and the queued rows are thrown away
+        sink, writer = self.start(BACKPRESSURE_BLOCK, fail_on = 1)
+        writer.put(1)
+        writer.put(2)
+        sink.release(2)
+        writer.close()
+        self.assertEqual(sink.rows, [0])
+        self.assertIsInstance(writer.error, OSError)
+        self.assertEqual(writer.depth(), 0)
+
+        with self.assertRaises(LogWriterError) as ctx:
+            writer.put(3)
+        self.assertIs(ctx.exception.__cause__, writer.error)
+
+    def test_error_while_blocked(self):
+        #A put waiting for room is let go with the error, rather than waiting
+        #forever on a writer which has stopped
+        sink, writer = self.start(BACKPRESSURE_BLOCK, queue_size = 1, fail_on = 0)
+        writer.put(1)
+        errors = []
+        def put():
+            try:
+                writer.put(2)
+            except LogWriterError as ex:
+                errors.append(ex)
+        putter = threading.Thread(target = put)
+        putter.start()
+        putter.join(0.1)
+        self.assertTrue(putter.is_alive())
+        sink.release()
+        putter.join(WAIT_TIMEOUT)
+        self.assertFalse(putter.is_alive())
+        self.assertEqual(len(errors), 1)
+        writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()